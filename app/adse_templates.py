@@ -0,0 +1,180 @@
+"""
+ADSE Four Quadrant Templates
+
+Static example templates for the Four Quadrant Requirements Method.
+Kept in their own module so the multi-KB template strings are only
+loaded when a template is actually requested.
+"""
+from __future__ import annotations
+import sys
+from types import MappingProxyType
+from typing import Mapping
+
+# Four Quadrant Templates for different project types
+QUADRANT_TEMPLATES: Mapping[str, dict[str, str]] = MappingProxyType({
+    "web_api": {
+        "functional_core": """系统要解决的核心业务问题是什么？
+
+示例：用户通过API完成核心业务流程
+- 用户认证和授权
+- 资源的CRUD操作
+- 业务逻辑处理
+
+请描述这个Slice要实现的核心功能，以及成功后的业务终态。""",
+        "physical_constraints": """技术栈和环境约束
+
+示例：
+- 框架: FastAPI / Flask
+- 数据库: PostgreSQL / MySQL
+- 认证方式: JWT / OAuth2
+- API文档: OpenAPI / Swagger
+- 性能要求: QPS > 1000
+
+请列出必须使用的技术栈、框架、性能要求等硬性约束。""",
+        "semantic_contract": """逻辑法则与安全边界（这是最重要的"立法"部分）
+
+示例：
+- 所有接口必须包含异常处理，返回标准错误格式
+- 数据库查询必须加索引，避免全表扫描
+- 敏感数据必须加密存储（密码使用bcrypt）
+- 数据一致性由数据库事务保证
+- 禁止直接返回数据库异常给客户端
+- 所有外部API调用必须设置超时时间
+
+请列出AI生成代码时必须遵守的规则，包括禁止的操作和强制的要求。""",
+        "exceptions_edges": """异常处理和边缘情况
+
+示例：
+- API超时: 返回504，记录日志，触发告警
+- 数据库连接失败: 重试3次，降级到缓存
+- 并发冲突: 使用乐观锁，返回409 Conflict
+- 参数校验失败: 返回400，详细说明错误字段
+- 库存为零: 返回具体错误码，提示用户
+
+请考虑各种异常情况和边缘场景，以及对应的处理策略。""",
+    },
+    "frontend": {
+        "functional_core": """用户通过UI完成核心交互操作
+
+示例：
+- 用户登录/注册
+- 数据展示和筛选
+- 表单提交和反馈
+
+请描述这个Slice要实现的核心交互功能。""",
+        "physical_constraints": """前端技术栈约束
+
+示例：
+- 框架: React / Vue / Next.js
+- UI库: Ant Design / Element Plus
+- 状态管理: Redux / Zustand
+- 构建工具: Vite / Webpack
+- 浏览器兼容: Chrome 90+, Safari 14+
+
+请列出前端技术栈和兼容性要求。""",
+        "semantic_contract": """前端代码规范和安全边界
+
+示例：
+- 所有用户输入必须校验和转义，防止XSS
+- 敏感操作必须二次确认
+- API错误必须友好展示给用户
+- 加载状态必须有明确提示
+- 禁止使用eval()等危险函数
+- 所有异步操作必须有错误处理
+
+请列出前端代码必须遵守的规则。""",
+        "exceptions_edges": """前端异常和边缘情况
+
+示例：
+- 网络请求失败: 展示重试按钮
+- 页面加载超时: 显示骨架屏
+- 用户权限不足: 跳转到403页面
+- 浏览器不支持: 提示升级浏览器
+
+请考虑前端可能遇到的各种异常情况。""",
+    },
+    "backend_service": {
+        "functional_core": """后端服务的核心业务逻辑
+
+示例：
+- 数据处理和转换
+- 消息队列消费
+- 定时任务执行
+
+请描述后端服务的核心功能。""",
+        "physical_constraints": """后端服务约束
+
+示例：
+- 语言: Python / Go / Java
+- 数据库: PostgreSQL / Redis
+- 消息队列: RabbitMQ / Kafka
+- 容器化: Docker / Kubernetes
+- 资源限制: 内存 < 512MB
+
+请列出后端服务的技术栈和资源约束。""",
+        "semantic_contract": """后端代码规范
+
+示例：
+- 所有数据库操作必须在事务中执行
+- 外部服务调用必须设置超时和熔断
+- 敏感配置从环境变量读取，禁止硬编码
+- 日志必须包含请求ID，便于追踪
+- 禁止在循环中执行数据库查询
+- 所有异常必须捕获并记录
+
+请列出后端代码必须遵守的规则。""",
+        "exceptions_edges": """后端服务异常处理
+
+示例：
+- 消息消费失败: 进入死信队列
+- 定时任务超时: 发送告警
+- 数据库连接池耗尽: 拒绝新请求
+- 依赖服务不可用: 降级到本地缓存
+
+请考虑后端服务可能遇到的异常情况。""",
+    },
+    "data_pipeline": {
+        "functional_core": """数据处理流程的核心功能
+
+示例：
+- 数据抽取和转换
+- 数据质量校验
+- 数据聚合和分析
+
+请描述数据管道的核心功能。""",
+        "physical_constraints": """数据管道约束
+
+示例：
+- 处理框架: Apache Airflow / dbt
+- 数据仓库: Snowflake / BigQuery
+- 数据湖: S3 / HDFS
+- 处理延迟: < 5分钟
+- 数据量级: TB级
+
+请列出数据管道的技术栈和性能要求。""",
+        "semantic_contract": """数据处理规范
+
+示例：
+- 所有数据必须有schema定义
+- 数据质量校验必须在转换前完成
+- 敏感数据必须脱敏处理
+- 数据血缘必须完整记录
+- 禁止在数据管道中硬编码密钥
+- 所有错误必须记录到监控系统
+
+请列出数据处理必须遵守的规则。""",
+        "exceptions_edges": """数据管道异常处理
+
+示例：
+- 数据源不可用: 重试3次，发送告警
+- 数据格式异常: 记录到错误表，跳过该条数据
+- 数据量突增: 触发扩容
+- 数据质量不合格: 阻断下游任务
+
+请考虑数据管道可能遇到的异常情况。""",
+    },
+})
+
+# Intern the template type keys so repeated lookups hash the same objects.
+for _key in list(QUADRANT_TEMPLATES):
+    sys.intern(_key)
@@ -9,23 +9,86 @@ Implements the ADSE toolchain for tracking and auditing AI-generated code:
 Based on the ADSE methodology by @超哥践行
 """
 from __future__ import annotations
+import bisect
+import functools
 import json
+import os
 import re
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional, List
+from typing import Any, ClassVar, Optional, List
 from datetime import datetime
 
-from .db import fetchone, fetchall, execute
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .db import fetchone, fetchall, execute, execute_many
 from .utils import now_iso
 from .adse import get_quadrants, ADSEQuadrants
 
 
+# Patterns compiled once at import so the hot parsing/audit paths skip
+# re's per-call cache lookup.
+_SPLIT_BULLET = re.compile(r'\n[-*•]\s*|\n(?=[A-Z])')
+_STRIP_BULLET = re.compile(r'^[-*•]\s*')
+_STRIP_NUM = re.compile(r'^\d+[\.\)]\s*')
+_KEYWORDS = re.compile(r'[一-鿿]+|[a-zA-Z]{3,}')
+
+_BULLET_CHARS = ("-", "*", "•")
+
+
+def _split_bullets(text: str):
+    """Split bullet-list text into items using plain string scanning.
+
+    Equivalent to splitting on newline-plus-bullet but stays in C-level
+    str methods instead of the regex engine; continuation lines are
+    folded into the preceding item.
+    """
+    buf: list[str] = []
+    for raw in text.splitlines():
+        s = raw.lstrip()
+        if s.startswith(_BULLET_CHARS):
+            yield " ".join(buf)
+            buf = [s[1:].lstrip()]
+        else:
+            buf.append(raw)
+    yield " ".join(buf)
+
+
+# Shared encoder so the stdlib fallback skips per-call encoder setup and
+# streams chunks instead of materializing nested intermediates for large
+# finding lists.
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def _dumps_json(obj: Any) -> str:
+    """Serialize audit payloads, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return "".join(_JSON_ENCODER.iterencode(obj))
+
+
+def _loads_json(s: str) -> Any:
+    """Deserialize audit payloads, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
 # =============================================================================
 # P2C Tracking Matrix
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class P2CTrackingItem:
     """P2C tracking item data class."""
     id: Optional[int]
@@ -41,37 +104,61 @@ class P2CTrackingItem:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
+    # Field names resolved once at class-creation time so to_dict avoids
+    # dataclasses.asdict's recursive deepcopy on every serialization.
+    _FIELD_NAMES: ClassVar[tuple[str, ...]] = ()
+
     def to_dict(self) -> dict:
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        return {
+            name: value
+            for name in self._FIELD_NAMES
+            if (value := getattr(self, name)) is not None
+        }
 
 
-def extract_instruction_id(category: str, index: int) -> str:
-    """Generate instruction ID from category and index."""
-    category_map = {
-        "functional": "FC",
-        "physical": "PC",
-        "semantic": "SC",  # Most important
-        "exception": "EX",
-    }
-    prefix = category_map.get(category, "MP")
-    return f"{prefix}-{index:03d}"
+P2CTrackingItem._FIELD_NAMES = tuple(P2CTrackingItem.__dataclass_fields__)
 
 
-def parse_semantic_contract(quadrants: ADSEQuadrants) -> List[dict]:
-    """
-    Parse semantic contract text into structured instructions.
+# Category prefixes hoisted out of extract_instruction_id, which is called
+# once per instruction in parse_semantic_contract's loops.
+_CATEGORY_PREFIX = {
+    "functional": "FC",
+    "physical": "PC",
+    "semantic": "SC",  # Most important
+    "exception": "EX",
+}
+_ID_FMT = "%s-%03d"
 
-    Args:
-        quadrants: ADSEQuadrants object
+# Keyword tuples for matching artifact paths to instruction categories in
+# update_p2c_from_artifacts; constants so the classification loop never
+# rebuilds them.
+_CAT_SUBSTR = {
+    "functional": ("prd", "doc"),
+    "physical": ("config", "setup", "requirement"),
+    "exception": ("error", "exception", "handler"),
+}
+_CAT_SUFFIX = {
+    "semantic": (".py", ".js", ".ts"),
+}
 
-    Returns:
-        List of instruction dictionaries
-    """
+
+def extract_instruction_id(category: str, index: int) -> str:
+    """Generate instruction ID from category and index."""
+    return _ID_FMT % (_CATEGORY_PREFIX.get(category, "MP"), index)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_semantic_contract_cached(
+    functional_core: str,
+    physical_constraints: str,
+    semantic_text: str,
+    exceptions_edges: str,
+) -> tuple[dict, ...]:
+    """Parse quadrant text into instructions, memoized on content."""
     instructions = []
-    semantic_text = quadrants.semantic_contract or ""
 
     # Split by common delimiters (newlines, bullets, dashes)
-    lines = re.split(r'\n[-*•]\s*|\n(?=[A-Z])', semantic_text)
+    lines = _SPLIT_BULLET.split(semantic_text)
 
     for i, line in enumerate(lines, 1):
         line = line.strip()
@@ -80,8 +167,8 @@ def parse_semantic_contract(quadrants: ADSEQuadrants) -> List[dict]:
 
         # Extract the core instruction
         # Remove common prefixes
-        clean_line = re.sub(r'^[-*•]\s*', '', line)
-        clean_line = re.sub(r'^\d+[\.\)]\s*', '', clean_line)
+        clean_line = _STRIP_BULLET.sub('', line)
+        clean_line = _STRIP_NUM.sub('', clean_line)
 
         instructions.append({
             "id": extract_instruction_id("semantic", i),
@@ -90,16 +177,16 @@ def parse_semantic_contract(quadrants: ADSEQuadrants) -> List[dict]:
         })
 
     # Also parse other quadrants
-    if quadrants.functional_core:
+    if functional_core:
         instructions.append({
             "id": extract_instruction_id("functional", 1),
-            "desc": f"实现功能核心: {quadrants.functional_core[:100]}...",
+            "desc": f"实现功能核心: {functional_core[:100]}...",
             "category": "functional",
         })
 
-    if quadrants.physical_constraints:
+    if physical_constraints:
         # Extract technical constraints
-        tech_lines = re.split(r'\n[-*•]\s*', quadrants.physical_constraints)
+        tech_lines = _split_bullets(physical_constraints)
         for i, line in enumerate(tech_lines, 1):
             line = line.strip()
             if line and len(line) > 5:
@@ -109,9 +196,9 @@ def parse_semantic_contract(quadrants: ADSEQuadrants) -> List[dict]:
                     "category": "physical",
                 })
 
-    if quadrants.exceptions_edges:
+    if exceptions_edges:
         # Extract exception handling requirements
-        exc_lines = re.split(r'\n[-*•]\s*', quadrants.exceptions_edges)
+        exc_lines = _split_bullets(exceptions_edges)
         for i, line in enumerate(exc_lines, 1):
             line = line.strip()
             if line and len(line) > 5:
@@ -121,7 +208,29 @@ def parse_semantic_contract(quadrants: ADSEQuadrants) -> List[dict]:
                     "category": "exception",
                 })
 
-    return instructions
+    return tuple(instructions)
+
+
+def parse_semantic_contract(quadrants: ADSEQuadrants) -> List[dict]:
+    """
+    Parse semantic contract text into structured instructions.
+
+    The regex-and-split work runs once per unique quadrant content —
+    create_p2c_tracking_items and initialize_project_control_table call
+    this back-to-back with identical text during slice setup.
+
+    Args:
+        quadrants: ADSEQuadrants object
+
+    Returns:
+        List of instruction dictionaries
+    """
+    return list(_parse_semantic_contract_cached(
+        quadrants.functional_core or "",
+        quadrants.physical_constraints or "",
+        quadrants.semantic_contract or "",
+        quadrants.exceptions_edges or "",
+    ))
 
 
 def create_p2c_tracking_items(slice_id: int) -> int:
@@ -132,7 +241,9 @@ def create_p2c_tracking_items(slice_id: int) -> int:
         slice_id: Slice ID
 
     Returns:
-        Number of items created
+        Number of items submitted. Items whose (slice_id, instruction_id)
+        already exists are skipped by the ON CONFLICT clause, so this can
+        exceed the number of rows actually inserted.
     """
     quadrants = get_quadrants(slice_id)
     if not quadrants:
@@ -141,25 +252,21 @@ def create_p2c_tracking_items(slice_id: int) -> int:
     instructions = parse_semantic_contract(quadrants)
 
     now = now_iso()
-    count = 0
 
-    for inst in instructions:
-        # Check if already exists
-        existing = fetchone(
-            "SELECT id FROM p2c_tracking WHERE slice_id = ? AND instruction_id = ?",
-            (slice_id, inst["id"])
-        )
-
-        if not existing:
-            execute(
-                """INSERT INTO p2c_tracking
-                   (slice_id, instruction_id, instruction_desc, instruction_category, status, created_at, updated_at)
-                   VALUES (?, ?, ?, ?, 'pending', ?, ?)""",
-                (slice_id, inst["id"], inst["desc"], inst["category"], now, now)
-            )
-            count += 1
+    # Dedup is handled by the unique (slice_id, instruction_id) index, so no
+    # existence SELECT is needed at all.
+    rows_to_insert = [
+        (slice_id, inst["id"], inst["desc"], inst["category"], now, now)
+        for inst in instructions
+    ]
 
-    return count
+    return execute_many(
+        """INSERT INTO p2c_tracking
+           (slice_id, instruction_id, instruction_desc, instruction_category, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, 'pending', ?, ?)
+           ON CONFLICT(slice_id, instruction_id) DO NOTHING""",
+        rows_to_insert
+    )
 
 
 def get_p2c_tracking_matrix(slice_id: int) -> List[dict]:
@@ -235,41 +342,55 @@ def update_p2c_from_artifacts(slice_id: int, artifacts: List[dict]) -> int:
                 file_map[path] = []
             file_map[path].append(kind)
 
-    # Get pending tracking items
-    tracking_items = fetchall(
-        "SELECT * FROM p2c_tracking WHERE slice_id = ? AND status = 'pending'",
-        (slice_id,)
-    )
+    # Classify each artifact path once against the constant keyword tuples.
+    category_paths: dict[str, list[str]] = {
+        "functional": [], "physical": [], "semantic": [], "exception": []
+    }
+    for path in file_map:
+        low = path.lower()
+        if any(k in low for k in _CAT_SUBSTR["functional"]):
+            category_paths["functional"].append(path)
+        if any(k in path for k in _CAT_SUBSTR["physical"]):
+            category_paths["physical"].append(path)
+        if path.endswith(_CAT_SUFFIX["semantic"]):
+            category_paths["semantic"].append(path)
+        if any(k in path for k in _CAT_SUBSTR["exception"]):
+            category_paths["exception"].append(path)
+
+    category_files = {cat: ",".join(paths) for cat, paths in category_paths.items()}
+
+    matched = {cat: files for cat, files in category_files.items() if files}
+    if not matched:
+        return 0
 
-    updated = 0
     now = now_iso()
 
-    for item in tracking_items:
-        item_dict = dict(item)
-
-        # Try to match instruction with files
-        matched_files = []
-        category = item_dict.get("instruction_category", "")
-
-        # Simple matching based on category
-        for file_path in file_map:
-            if category == "functional" and any(k in file_path.lower() for k in ["prd", "doc"]):
-                matched_files.append(file_path)
-            elif category == "physical" and any(k in file_path for k in ["config", "setup", "requirement"]):
-                matched_files.append(file_path)
-            elif category == "semantic" and any(k in file_path for k in [".py", ".js", ".ts"]):
-                matched_files.append(file_path)
-            elif category == "exception" and any(k in file_path for k in ["error", "exception", "handler"]):
-                matched_files.append(file_path)
-
-        if matched_files:
-            execute(
-                """UPDATE p2c_tracking
-                   SET target_files = ?, status = 'needs_audit', updated_at = ?
-                   WHERE id = ?""",
-                (",".join(matched_files), now, item_dict["id"])
-            )
-            updated += 1
+    # One UPDATE with a CASE over the matched categories instead of fetching
+    # the pending rows and updating them one by one from Python.
+    placeholders = ",".join("?" for _ in matched)
+    where = (
+        "slice_id = ? AND status = 'pending' "
+        f"AND instruction_category IN ({placeholders})"
+    )
+    where_params = (slice_id, *matched)
+
+    row = fetchone(
+        f"SELECT COUNT(*) AS n FROM p2c_tracking WHERE {where}",
+        where_params
+    )
+    updated = int(row["n"]) if row else 0
+    if not updated:
+        return 0
+
+    case_clauses = " ".join("WHEN ? THEN ?" for _ in matched)
+    case_params = [p for cat_files in matched.items() for p in cat_files]
+    execute(
+        f"""UPDATE p2c_tracking
+            SET target_files = CASE instruction_category {case_clauses} END,
+                status = 'needs_audit', updated_at = ?
+            WHERE {where}""",
+        (*case_params, now, *where_params)
+    )
 
     return updated
 
@@ -278,7 +399,7 @@ def update_p2c_from_artifacts(slice_id: int, artifacts: List[dict]) -> int:
 # Logic Coverage Audit
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class LogicAuditFinding:
     """Logic audit finding data class."""
     instruction_id: str
@@ -287,8 +408,17 @@ class LogicAuditFinding:
     result: str  # pass, fail, partial
     notes: Optional[str]
 
+    def to_dict(self) -> dict:
+        return {
+            "instruction_id": self.instruction_id,
+            "instruction_desc": self.instruction_desc,
+            "code_snippet": self.code_snippet,
+            "result": self.result,
+            "notes": self.notes,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class LogicAuditReport:
     """Logic audit report data class."""
     slice_id: int
@@ -310,7 +440,7 @@ class LogicAuditReport:
             "passed_rules": self.passed_rules,
             "failed_rules": self.failed_rules,
             "coverage_percent": self.coverage_percent,
-            "findings": [asdict(f) for f in self.findings],
+            "findings": [f.to_dict() for f in self.findings],
             "created_at": self.created_at,
         }
 
@@ -334,6 +464,32 @@ def run_semantic_audit(slice_id: int, worktree_path: Path, run_id: Optional[int]
     failed = 0
     partial = 0
 
+    # The same file is commonly referenced by several instructions, so stat
+    # and read each unique target file at most once per audit.
+    all_files = {
+        f
+        for item in tracking_items
+        for f in (item.get("target_files") or "").split(",")
+        if f
+    }
+    # One scandir per referenced directory instead of a stat syscall per
+    # target file.
+    existing_files: set[str] = set()
+    dir_entries: dict[Path, set[str]] = {}
+    for f in all_files:
+        p = worktree_path / f.lstrip("/")
+        names = dir_entries.get(p.parent)
+        if names is None:
+            try:
+                with os.scandir(p.parent) as it:
+                    names = {e.name for e in it}
+            except OSError:
+                names = set()
+            dir_entries[p.parent] = names
+        if p.name in names:
+            existing_files.add(f)
+    content_cache: dict[str, str] = {}
+
     for item in tracking_items:
         instruction_id = item["instruction_id"]
         instruction_desc = item["instruction_desc"]
@@ -353,13 +509,16 @@ def run_semantic_audit(slice_id: int, worktree_path: Path, run_id: Optional[int]
             files = target_files.split(",")
             found_files = []
             for f in files:
-                file_path = worktree_path / f.lstrip("/")
-                if file_path.exists():
+                if f in existing_files:
+                    file_path = worktree_path / f.lstrip("/")
                     found_files.append(str(file_path))
 
                     # Try to find relevant code snippet
                     try:
-                        content = file_path.read_text(encoding="utf-8", errors="ignore")
+                        content = content_cache.get(f)
+                        if content is None:
+                            content = file_path.read_text(encoding="utf-8", errors="ignore")
+                            content_cache[f] = content
                         # Extract a snippet around relevant keywords
                         snippet = extract_relevant_snippet(content, instruction_desc)
                         if snippet:
@@ -396,7 +555,7 @@ def run_semantic_audit(slice_id: int, worktree_path: Path, run_id: Optional[int]
     )
 
     # Save report
-    findings_json = json.dumps(report.to_dict(), ensure_ascii=False)
+    findings_json = _dumps_json(report.to_dict())
     report_id = execute(
         """INSERT INTO logic_audit_reports
            (slice_id, run_id, audit_type, total_rules, passed_rules, failed_rules, coverage_percent, findings_json, created_at)
@@ -412,12 +571,37 @@ def run_semantic_audit(slice_id: int, worktree_path: Path, run_id: Optional[int]
 def extract_relevant_snippet(content: str, instruction: str) -> Optional[str]:
     """Extract relevant code snippet based on instruction keywords."""
     # Extract keywords from instruction
-    keywords = re.findall(r'[\u4e00-\u9fff]+|[a-zA-Z]{3,}', instruction)
+    keywords = _KEYWORDS.findall(instruction)[:3]  # Check first 3 keywords
+    if not keywords:
+        return None
 
-    # Try to find lines with keywords
     lines = content.split("\n")
+
+    if AHOCORASICK_AVAILABLE:
+        # Single multi-pattern pass over the whole content instead of an
+        # O(lines x keywords) Python-level substring scan.
+        automaton = ahocorasick.Automaton()
+        for kw in keywords:
+            automaton.add_word(kw, kw)
+        automaton.make_automaton()
+
+        # Offsets of each line start so a hit offset maps back to its line.
+        line_starts = [0]
+        for line in lines:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+
+        for end_index, _kw in automaton.iter(content):
+            i = bisect.bisect_right(line_starts, end_index) - 1
+            if len(lines[i].strip()) > 10:
+                # Get context (2 lines before and after)
+                start = max(0, i - 2)
+                end = min(len(lines), i + 3)
+                return "\n".join(lines[start:end])
+        return None
+
+    # Fallback: try to find lines with keywords
     for i, line in enumerate(lines):
-        for kw in keywords[:3]:  # Check first 3 keywords
+        for kw in keywords:
             if kw in line and len(line.strip()) > 10:
                 # Get context (2 lines before and after)
                 start = max(0, i - 2)
@@ -427,7 +611,41 @@ def extract_relevant_snippet(content: str, instruction: str) -> Optional[str]:
     return None
 
 
-def get_audit_reports(slice_id: int, limit: int = 10) -> List[dict]:
+class AuditReportView:
+    """Lazy view over a logic_audit_reports row.
+
+    Exposes the row columns as attributes and items; findings_json is
+    only deserialized on first access to ``findings``, so callers that
+    just read summary fields skip the JSON decode entirely.
+    """
+    __slots__ = ("_row", "_findings")
+
+    def __init__(self, row):
+        self._row = row
+        self._findings = None
+
+    @property
+    def findings(self):
+        if self._findings is None:
+            try:
+                self._findings = _loads_json(self._row["findings_json"])
+            except Exception:
+                self._findings = []
+        return self._findings
+
+    def __getattr__(self, name):
+        return self._row[name]
+
+    def __getitem__(self, key):
+        if key == "findings":
+            return self.findings
+        return self._row[key]
+
+    def keys(self):
+        return self._row.keys()
+
+
+def get_audit_reports(slice_id: int, limit: int = 10) -> List[AuditReportView]:
     """
     Get audit reports for a slice.
 
@@ -436,7 +654,7 @@ def get_audit_reports(slice_id: int, limit: int = 10) -> List[dict]:
         limit: Maximum number of reports
 
     Returns:
-        List of audit report dictionaries
+        List of lazy audit report views
     """
     rows = fetchall(
         """SELECT * FROM logic_audit_reports
@@ -445,23 +663,14 @@ def get_audit_reports(slice_id: int, limit: int = 10) -> List[dict]:
            LIMIT ?""",
         (slice_id, limit)
     )
-    reports = []
-    for row in rows:
-        report = dict(row)
-        try:
-            report["findings"] = json.loads(report["findings_json"])
-        except:
-            report["findings"] = []
-        reports.append(report)
-
-    return reports
+    return [AuditReportView(r) for r in rows]
 
 
 # =============================================================================
 # ADSE Project Control Table 2.0
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ProjectControlItem:
     """ADSE project control item data class."""
     slice_id: int
@@ -475,7 +684,17 @@ class ProjectControlItem:
     verified_by: Optional[int] = None
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "slice_id": self.slice_id,
+            "control_layer": self.control_layer,
+            "control_item": self.control_item,
+            "requirement_source": self.requirement_source,
+            "tracking_mechanism": self.tracking_mechanism,
+            "acceptance_criteria": self.acceptance_criteria,
+            "status": self.status,
+            "verified_at": self.verified_at,
+            "verified_by": self.verified_by,
+        }
 
 
 def initialize_project_control_table(slice_id: int) -> int:
@@ -499,7 +718,9 @@ def initialize_project_control_table(slice_id: int) -> int:
         return 0
 
     now = now_iso()
-    count = 0
+    # Control rows are accumulated and inserted with one executemany instead
+    # of a statement per item.
+    rows: list[tuple] = []
 
     # Layer 1: Base Layer - Physical Constraints
     if quadrants.physical_constraints:
@@ -511,14 +732,13 @@ def initialize_project_control_table(slice_id: int) -> int:
             "依赖管理",
         ]
         for item in constraints:
-            _create_control_item(
+            rows.append((
                 slice_id, "base", item,
                 "physical_constraints",
                 "路径隔离校验清单",
                 "/core 严禁被业务 Hook 修改",
-                now
-            )
-            count += 1
+                now, now
+            ))
 
     # Layer 2: Contract Layer - Semantic Contract
     if quadrants.semantic_contract:
@@ -526,14 +746,13 @@ def initialize_project_control_table(slice_id: int) -> int:
         semantic_count = 0
         for inst in instructions:
             if inst["category"] == "semantic" and semantic_count < 5:  # Limit to 5 key items
-                _create_control_item(
+                rows.append((
                     slice_id, "contract", f"语义契约: {inst['desc'][:30]}...",
                     "semantic_contract",
                     f"P2C追踪ID: {inst['id']}",
                     "核心逻辑必须符合语义契约中的「确定性」",
-                    now
-                )
-                count += 1
+                    now, now
+                ))
                 semantic_count += 1
 
     # Layer 3: Slot Layer - Hooks
@@ -544,14 +763,13 @@ def initialize_project_control_table(slice_id: int) -> int:
         "日志记录Hook",
     ]
     for item in slot_items:
-        _create_control_item(
+        rows.append((
             slice_id, "slot", item,
             "functional_core",
             "钩子调用链分析图",
             "所有状态变更必须触发对应的Hook",
-            now
-        )
-        count += 1
+            now, now
+        ))
 
     # Layer 4: Protection Layer - Anti-patterns
     if quadrants.semantic_contract:
@@ -561,34 +779,20 @@ def initialize_project_control_table(slice_id: int) -> int:
             "异常处理覆盖",
         ]
         for item in protection_items:
-            _create_control_item(
+            rows.append((
                 slice_id, "protection", item,
                 "semantic_contract",
                 "自动化静态代码扫描",
                 "代码中不得出现Anti-pattern清单内容",
-                now
-            )
-            count += 1
-
-    return count
-
-
-def _create_control_item(
-    slice_id: int,
-    layer: str,
-    item: str,
-    source: str,
-    tracking: str,
-    acceptance: str,
-    created_at: str,
-) -> int:
-    """Helper to create a control item."""
-    return execute(
+                now, now
+            ))
+
+    return execute_many(
         """INSERT INTO adse_project_control
            (slice_id, control_layer, control_item, requirement_source,
             tracking_mechanism, acceptance_criteria, status, created_at, updated_at)
            VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?)""",
-        (slice_id, layer, item, source, tracking, acceptance, created_at, created_at)
+        rows
     )
 
 
@@ -647,10 +851,17 @@ def get_control_summary(slice_id: int) -> dict:
     Returns:
         Summary dictionary with counts by layer and status
     """
-    items = get_project_control_table(slice_id)
+    # Aggregate in SQL instead of materializing every control row as a dict.
+    rows = fetchall(
+        """SELECT control_layer, status, COUNT(*) AS n
+           FROM adse_project_control
+           WHERE slice_id = ?
+           GROUP BY control_layer, status""",
+        (slice_id,)
+    )
 
     summary = {
-        "total": len(items),
+        "total": 0,
         "by_layer": {
             "base": 0,
             "contract": 0,
@@ -665,15 +876,18 @@ def get_control_summary(slice_id: int) -> dict:
         "coverage_percent": 0,
     }
 
-    for item in items:
-        layer = item.get("control_layer", "")
-        status = item.get("status", "pending")
+    for row in rows:
+        layer = row["control_layer"]
+        status = row["status"]
+        n = row["n"]
+
+        summary["total"] += n
 
         if layer in summary["by_layer"]:
-            summary["by_layer"][layer] += 1
+            summary["by_layer"][layer] += n
 
         if status in summary["by_status"]:
-            summary["by_status"][status] += 1
+            summary["by_status"][status] += n
 
     # Calculate coverage
     total = summary["total"]
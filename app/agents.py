@@ -1,13 +1,19 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import re
+
+import jinja2
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterable, Optional
 
 from .config import ROLE_ALLOWED_PREFIXES
 from .git_ops import write_file
+from .jobs import submit_async
 from .utils import within_prefix, now_iso
 from .text_blocks import upsert_block
-from .llm_client import get_llm_client, LLMMessage
+from .llm_client import get_llm_client, LLMClient, LLMMessage, LLMResponse
 from .llm_config import get_effective_config
 from .adse import get_quadrants, generate_meta_prompt, save_meta_prompt, ADSEQuadrants
 
@@ -81,50 +87,82 @@ def _get_adse_system_prompt(role: str) -> str:
     return base_prompt + "\n\n" + role_prompts.get(role, "")
 
 
-def _get_standard_prompt(
-    slice_obj: dict[str, Any],
-    role: str,
-    ac_list: list[dict[str, Any]],
-) -> tuple[str, str]:
-    """Get the standard prompt for non-ADSE mode."""
-    ac_text = "\n".join([f"- {a['code']}: {a['text']}" for a in ac_list])
+# ----------------------------------------------------------------------------
+# Prompt templates
+#
+# User prompts live in app/prompts/*.j2 and are compiled once by jinja2 at
+# first use (the Environment caches template objects). Each template keeps
+# the multi-KB instruction skeleton byte-identical at the start and the
+# slice context at the tail, so provider-side prompt caching can reuse the
+# prefill across slices; only the short dynamic suffix varies per call.
+# ----------------------------------------------------------------------------
 
-    if role == "pm":
-        system_prompt = "你是一位经验丰富的产品经理，擅长编写清晰、完整的产品需求文档。你的输出应该结构化、专业且易于理解。"
-        user_prompt = f"""你是一位资深产品经理。请为以下 Slice 生成完整的产品需求文档（PRD）。
+_CONTEXT_SEP = "\n\n---\nSlice 上下文：\n"
 
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 范围: {slice_obj['scope']}
-- 不包含范围: {slice_obj['out_of_scope']}
+_PROMPT_ENV = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(str(Path(__file__).parent / "prompts")),
+    autoescape=False,
+    auto_reload=False,
+)
 
-验收标准：
-{ac_text}
 
-请生成包含以下内容的 PRD（使用 Markdown 格式）：
+def _render_prompt(name: str, **context: Any) -> str:
+    """Render a prompt template from app/prompts/<name>.j2."""
+    return _PROMPT_ENV.get_template(f"{name}.j2").render(**context)
 
-## Slice {slice_obj['id']}: {slice_obj['title']}
 
-### 背景与目标
-- 背景：（说明为什么要做这个功能）
-- 目标：（明确的功能目标）
+def _slice_context_block(slice_obj: dict[str, Any], ac_list: list[dict[str, Any]]) -> str:
+    """
+    Canonical slice-context block shared by every role prompt.
 
-### 用户故事
-- US-001 作为 <角色>，我希望 <能力>，以便 <收益>
-- （根据验收标准生成 2-5 个用户故事）
+    All sibling role requests for one slice carry this byte-identical
+    block (same fields, same order, same ac_text formatting), so
+    provider-side caching and the response cache see one shared segment
+    per slice instead of per-role variants that differ only in
+    formatting.
+    """
+    ac_text = "\n".join(f"- {a['code']}: {a['text']}" for a in ac_list)
+    return (
+        f"- ID: {slice_obj['id']}\n"
+        f"- 标题: {slice_obj['title']}\n"
+        f"- 分支: {slice_obj['branch_name']}\n"
+        f"- 范围: {slice_obj['scope']}\n"
+        f"- 不包含范围: {slice_obj['out_of_scope']}\n"
+        f"- 风险级别: {slice_obj['risk_level']}\n\n"
+        f"验收标准：\n{ac_text}"
+    )
 
-### 业务规则 / 边界条件
-- 规则：（列出业务规则）
-- 边界：（说明功能的边界）
-- 异常流程（含错误码期望）：
 
-### 非功能性需求
-- 性能要求
-- 安全要求
-- 可用性要求
+def _content_hash(slice_obj: dict[str, Any], ac_list: list[dict[str, Any]], role: str, model: str) -> str:
+    """
+    Hash of everything a role's output depends on (slice data, acceptance
+    criteria, role, model). Stored as a marker in generated files so
+    unchanged slices can skip regeneration. BLAKE2b: fast, non-security.
+    """
+    payload = f"{role}\n{model}\n{_slice_context_block(slice_obj, ac_list)}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 
-请确保内容专业、完整、可执行。"""
+def _files_current(worktree: Path, rel_paths: Iterable[str], marker: str) -> bool:
+    """Check that every target file exists and carries the current hash marker."""
+    for rel in rel_paths:
+        try:
+            if marker not in (worktree / rel).read_text(encoding="utf-8", errors="replace"):
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _get_standard_prompt(
+    slice_obj: dict[str, Any],
+    role: str,
+    ac_list: list[dict[str, Any]],
+) -> tuple[str, str]:
+    """Get the standard prompt for non-ADSE mode."""
+    if role == "pm":
+        system_prompt = "你是一位经验丰富的产品经理，擅长编写清晰、完整的产品需求文档。你的输出应该结构化、专业且易于理解。"
+        user_prompt = _render_prompt("pm_prd", slice_context=_slice_context_block(slice_obj, ac_list))
     else:
         # For other roles, return empty prompts to be handled by existing code
         system_prompt = ""
@@ -137,6 +175,37 @@ class AgentOutput:
     changed_files: list[str]
     summary: str
 
+
+def _chat_concurrently(
+    llm: LLMClient,
+    prompts: list[tuple[str, str]],
+    max_tokens: int = 4096,
+) -> list[LLMResponse]:
+    """
+    Run independent (system_prompt, user_prompt) completions concurrently.
+
+    The requests are pure network I/O, so issuing them together collapses
+    wall time to the slowest response instead of the sum. Responses are
+    returned in the same order as the prompts; errors are captured per
+    response, never raised.
+
+    Batches run on the persistent jobs loop rather than asyncio.run: the
+    memoized AsyncOpenAI clients keep their connection pools bound to the
+    loop they first ran on, so a throwaway loop per batch would leave the
+    second batch awaiting connections of a closed loop.
+    """
+    async def _gather() -> list[LLMResponse]:
+        return await asyncio.gather(*(
+            llm.achat_simple(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                max_tokens=max_tokens,
+            )
+            for system_prompt, user_prompt in prompts
+        ))
+
+    return submit_async(_gather()).result()
+
 def run_pm(
     worktree: Path,
     slice_obj: dict[str, Any],
@@ -144,68 +213,40 @@ def run_pm(
     user_id: Optional[int] = None,
     project_id: Optional[int] = None,
 ) -> AgentOutput:
+    sid = slice_obj["id"]
+    title = slice_obj["title"]
+    branch = slice_obj["branch_name"]
+
     prd_path = "docs/PRD.md"
     acc_path = "docs/ACCEPTANCE.md"
-    task_path = f"tasks/{slice_obj['id']:04d}-{slice_obj['branch_name'].replace('/', '_')}.md"
+    task_path = f"tasks/{sid:04d}-{branch.replace('/', '_')}.md"
     _assert_allowed("pm", [prd_path, acc_path, task_path])
 
-    start = f"<!-- slice:{slice_obj['id']}:start -->"
-    end = f"<!-- slice:{slice_obj['id']}:end -->"
+    start = f"<!-- slice:{sid}:start -->"
+    end = f"<!-- slice:{sid}:end -->"
 
     # Get LLM client with hierarchical config
     llm = get_llm_client(user_id=user_id, project_id=project_id)
 
-    # Get appropriate prompt based on ADSE mode
-    system_prompt, user_prompt = _get_agent_prompt(slice_obj, "pm", ac_list, user_id, project_id)
-
-    # If we didn't get a custom prompt, fall back to the old way
-    if not user_prompt:
-        ac_text = "\n".join([f"- {a['code']}: {a['text']}" for a in ac_list])
-        system_prompt = "你是一位经验丰富的产品经理，擅长编写清晰、完整的产品需求文档。你的输出应该结构化、专业且易于理解。"
-        user_prompt = f"""你是一位资深产品经理。请为以下 Slice 生成完整的产品需求文档（PRD）。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 范围: {slice_obj['scope']}
-- 不包含范围: {slice_obj['out_of_scope']}
-
-验收标准：
-{ac_text}
-
-请生成包含以下内容的 PRD（使用 Markdown 格式）：
-
-## Slice {slice_obj['id']}: {slice_obj['title']}
-
-### 背景与目标
-- 背景：（说明为什么要做这个功能）
-- 目标：（明确的功能目标）
-
-### 用户故事
-- US-001 作为 <角色>，我希望 <能力>，以便 <收益>
-- （根据验收标准生成 2-5 个用户故事）
+    ac_text = "\n".join([f"- {a['code']}: {a['text']}" for a in ac_list])
 
-### 业务规则 / 边界条件
-- 规则：（列出业务规则）
-- 边界：（说明功能的边界）
-- 异常流程（含错误码期望）：
+    # Get appropriate prompt based on ADSE mode; _get_agent_prompt already
+    # falls back to the standard pm prompt when ADSE is off or empty.
+    system_prompt, user_prompt = _get_agent_prompt(slice_obj, "pm", ac_list, user_id, project_id)
+    assert user_prompt, "pm prompt must be non-empty"
 
-### 非功能性需求
-- 性能要求
-- 安全要求
-- 可用性要求
+    # 生成验收标准文档
+    acc_prompt = _render_prompt("pm_acc", slice_context=_slice_context_block(slice_obj, ac_list))
 
-请确保内容专业、完整、可执行。"""
-
-    prd_response = llm.chat_simple(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        max_tokens=4096,
-    )
+    # PRD 和验收标准文档相互独立，可以并发生成
+    prd_response, acc_response = _chat_concurrently(llm, [
+        (system_prompt, user_prompt),
+        ("你是一位质量专家，擅长制定清晰、可验证的验收标准。", acc_prompt),
+    ])
 
     if prd_response.error:
         # Fallback to template if LLM fails
-        prd_block = f"""## Slice {slice_obj['id']}: {slice_obj['title']}
+        prd_block = f"""## Slice {sid}: {title}
 
 ### 背景与目标
 - 背景：
@@ -226,35 +267,6 @@ Slice 信息：
 
     upsert_block(worktree / prd_path, start, end, prd_block)
 
-    # 生成验收标准文档
-    acc_prompt = f"""你是一位资深产品经理。请为以下 Slice 生成验收标准文档。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-
-验收标准：
-{ac_text}
-
-请为每个验收标准生成详细的验收条件和验证方式。格式如下：
-
-## Slice {slice_obj['id']}: {slice_obj['title']}
-
-### AC001 标题
-- 验收：
-  - (可验证的验收条件)
-  - (可验证的验收条件)
-- 验证方式：
-  - (测试步骤或验证方法)
-
-请确保验收条件具体、可测量、可验证。"""
-
-    acc_response = llm.chat_simple(
-        system_prompt="你是一位质量专家，擅长制定清晰、可验证的验收标准。",
-        user_prompt=acc_prompt,
-        max_tokens=4096,
-    )
-
     if acc_response.error:
         # Fallback to template if LLM fails
         acc_items = []
@@ -267,7 +279,7 @@ Slice 信息：
   - {a['verification']}
 """
             )
-        acc_block = f"""## Slice {slice_obj['id']}: {slice_obj['title']}
+        acc_block = f"""## Slice {sid}: {title}
 """ + "\n".join(acc_items)
     else:
         acc_block = acc_response.content
@@ -275,8 +287,8 @@ Slice 信息：
     upsert_block(worktree / acc_path, start, end, acc_block)
 
     # 生成任务卡片
-    task = f"""# Slice: {slice_obj['title']}
-Branch: `{slice_obj['branch_name']}`
+    task = f"""# Slice: {title}
+Branch: `{branch}`
 
 ## AC
 """ + "\n".join([f"- {a['code']}: {a['text']}" for a in ac_list]) + f"""
@@ -299,77 +311,56 @@ def run_architect(
     user_id: Optional[int] = None,
     project_id: Optional[int] = None,
 ) -> AgentOutput:
+    sid = slice_obj["id"]
+    title = slice_obj["title"]
+
     design_path = "docs/DESIGN.md"
     test_path = "docs/TEST_STRATEGY.md"
     openapi_path = "contracts/openapi.yaml"
-    adr_path = f"docs/adr/ADR-{slice_obj['id']:04d}-slice.md"
+    adr_path = f"docs/adr/ADR-{sid:04d}-slice.md"
     _assert_allowed("architect", [design_path, test_path, openapi_path, adr_path])
 
-    start = f"<!-- slice:{slice_obj['id']}:start -->"
-    end = f"<!-- slice:{slice_obj['id']}:end -->"
+    start = f"<!-- slice:{sid}:start -->"
+    end = f"<!-- slice:{sid}:end -->"
 
     llm = get_llm_client(user_id=user_id, project_id=project_id)
-    ac_text = "\n".join([f"- {a['code']}: {a['text']}" for a in ac_list])
-
-    # 生成设计文档
-    design_prompt = f"""你是一位资深架构师。请为以下 Slice 生成详细的技术设计文档。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 范围: {slice_obj['scope']}
-- 风险级别: {slice_obj['risk_level']}
-
-验收标准：
-{ac_text}
-
-请生成包含以下内容的设计文档：
-
-## Slice {slice_obj['id']}: {slice_obj['title']}
 
-### 系统架构
-- 整体架构设计
-- 模块划分
+    # Skip the LLM entirely when the existing docs were generated from the
+    # exact same slice payload (marker embedded on the previous run). The
+    # openapi contract carries no marker, but it must exist to skip — a
+    # missing contract is regenerated regardless of doc currency.
+    marker = f"<!-- hash:{_content_hash(slice_obj, ac_list, 'architect', llm.model)} -->"
+    if (worktree / openapi_path).exists() and _files_current(worktree, [design_path, test_path], marker):
+        return AgentOutput([design_path, test_path], "Design docs unchanged; skipped regeneration (content hash match).")
 
-### API 契约
-- RESTful API 设计
-- 请求/响应格式
-- 错误码定义
-
-### 数据模型
-- 数据库设计
-- 缓存策略
-
-### 并发协作策略
-- 每 slice 一条分支
-- 每次运行一个 worktree（隔离 checkout）
+    slice_context = _slice_context_block(slice_obj, ac_list)
 
-### 幂等/超时/重试/限流
-- 接口幂等性设计
-- 超时处理
-- 重试策略
-- 限流方案
+    # 生成设计文档
+    design_prompt = _render_prompt("arch_design", slice_context=slice_context)
 
-### 安全设计
-- 认证授权
-- 数据加密
-- SQL/XSS 防护
+    # 生成测试策略
+    test_prompt = _render_prompt("arch_test", slice_context=slice_context)
 
-### 可观测性
-- 日志规范
-- 监控指标
-- 告警规则
+    prompts = [
+        ("你是一位经验丰富的架构师，擅长设计高可用、高性能、可扩展的系统。你的设计应该清晰、专业且易于实现。", design_prompt),
+        ("你是一位经验丰富的测试专家，擅长设计全面的测试策略和质量保障体系。", test_prompt),
+    ]
 
-请确保设计专业、完整、可落地。"""
+    need_openapi = not (worktree / openapi_path).exists()
+    if need_openapi:
+        # 生成 OpenAPI 契约
+        openapi_prompt = _render_prompt("arch_openapi", slice_context=slice_context)
+        prompts.append((
+            "你是一位 API 设计专家，精通 OpenAPI 3.0 规范。输出应该是纯 YAML 格式，不要包含任何解释文字。",
+            openapi_prompt,
+        ))
 
-    design_response = llm.chat_simple(
-        system_prompt="你是一位经验丰富的架构师，擅长设计高可用、高性能、可扩展的系统。你的设计应该清晰、专业且易于实现。",
-        user_prompt=design_prompt,
-        max_tokens=4096,
-    )
+    # 三份文档相互独立，可以并发生成
+    responses = _chat_concurrently(llm, prompts)
+    design_response, test_response = responses[0], responses[1]
 
     if design_response.error:
-        design_block = f"""## Slice {slice_obj['id']}: {slice_obj['title']}
+        design_block = f"""## Slice {sid}: {title}
 
 ### API 契约
 - contracts/openapi.yaml
@@ -387,57 +378,13 @@ Slice 信息：
 [LLM Error: {design_response.error}]
 """
     else:
-        design_block = design_response.content
+        # Error fallbacks carry no marker so a retry regenerates them
+        design_block = f"{design_response.content}\n\n{marker}"
 
     upsert_block(worktree / design_path, start, end, design_block)
 
-    # 生成测试策略
-    test_prompt = f"""你是一位资深测试架构师。请为以下 Slice 生成测试策略文档。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 风险级别: {slice_obj['risk_level']}
-
-验收标准：
-{ac_text}
-
-请生成测试策略，包括：
-
-## Slice {slice_obj['id']}: {slice_obj['title']}
-
-### 测试金字塔
-- 单元测试：核心路径 + 边界条件
-- 集成测试：模块间交互
-- 端到端测试：关键业务流程
-
-### 测试工具
-- 单元测试框架
-- API 测试工具
-- 性能测试工具
-
-### 测试命令
-```bash
-make lint    # 代码规范检查
-make type     # 类型检查
-make contract # 契约测试
-make test     # 运行所有测试
-```
-
-### 覆盖率要求
-- 代码覆盖率目标
-- 关键路径覆盖率
-
-请确保测试策略全面、可执行。"""
-
-    test_response = llm.chat_simple(
-        system_prompt="你是一位经验丰富的测试专家，擅长设计全面的测试策略和质量保障体系。",
-        user_prompt=test_prompt,
-        max_tokens=4096,
-    )
-
     if test_response.error:
-        test_block = f"""## Slice {slice_obj['id']}: {slice_obj['title']}
+        test_block = f"""## Slice {sid}: {title}
 - 单测：核心路径 + 错误分支
 - 合同测试：openapi.yaml 对齐
 - 集成测：必要时 docker compose
@@ -451,36 +398,13 @@ make test     # 运行所有测试
 [LLM Error: {test_response.error}]
 """
     else:
-        test_block = test_response.content
+        test_block = f"{test_response.content}\n\n{marker}"
 
     upsert_block(worktree / test_path, start, end, test_block)
 
     created = []
-    if not (worktree / openapi_path).exists():
-        # 生成 OpenAPI 契约
-        openapi_prompt = f"""你是一位 API 设计专家。请为以下 Slice 生成 OpenAPI 3.0 规范。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 范围: {slice_obj['scope']}
-
-验收标准：
-{ac_text}
-
-请生成完整的 OpenAPI 3.0 YAML 规范，包括：
-- API 信息
-- 所有端点（GET, POST, PUT, DELETE）
-- 请求/响应 schema
-- 错误响应定义
-
-直接输出 YAML 内容，不要包含 markdown 代码块标记。"""
-
-        openapi_response = llm.chat_simple(
-            system_prompt="你是一位 API 设计专家，精通 OpenAPI 3.0 规范。输出应该是纯 YAML 格式，不要包含任何解释文字。",
-            user_prompt=openapi_prompt,
-            max_tokens=4096,
-        )
+    if need_openapi:
+        openapi_response = responses[2]
 
         if openapi_response.error:
             openapi = """openapi: 3.0.3
@@ -510,7 +434,7 @@ paths:
         created.append(openapi_path)
 
     # 生成 ADR
-    adr = f"""# ADR-{slice_obj['id']:04d}: Slice Design Notes
+    adr = f"""# ADR-{sid:04d}: Slice Design Notes
 - Branch: {slice_obj['branch_name']}
 - Decision: Contract-first + per-slice branch + worktree isolation
 - Generated at: {now_iso()}
@@ -531,51 +455,7 @@ def run_dev(
     llm = get_llm_client(user_id=user_id, project_id=project_id)
     ac_text = "\n".join([f"- [ ] {a['code']}: {a['text']}" for a in ac_list])
 
-    dev_prompt = f"""你是一位资深开发工程师。请为以下 Slice 生成开发报告和实施计划。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 分支: {slice_obj['branch_name']}
-- 范围: {slice_obj['scope']}
-- 风险级别: {slice_obj['risk_level']}
-
-验收标准：
-{ac_text}
-
-请生成包含以下内容的开发报告：
-
-# 开发报告
-
-## Slice 概述
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 分支: {slice_obj['branch_name']}
-- 风险级别: {slice_obj['risk_level']}
-
-## 验收标准清单
-{ac_text}
-
-## 实施计划
-### 1. 技术栈选择
-### 2. 目录结构设计
-### 3. 核心模块开发
-### 4. 接口实现
-
-## 质量门禁
-```bash
-make lint    # 代码规范检查
-make type     # 类型检查
-make contract # 契约测试
-make test     # 单元测试
-```
-
-## 开发注意事项
-- 代码风格
-- 性能考虑
-- 安全要点
-
-请确保实施计划详细、可执行。"""
+    dev_prompt = _render_prompt("dev", slice_context=_slice_context_block(slice_obj, ac_list))
 
     dev_response = llm.chat_simple(
         system_prompt="你是一位经验丰富的开发工程师，擅长将需求转化为高质量、可维护的代码。你的输出应该专业、详细且实用。",
@@ -618,56 +498,7 @@ def run_qa(
     llm = get_llm_client(user_id=user_id, project_id=project_id)
     ac_text = "\n".join([f"- {a['code']}: {a['text']}" for a in ac_list])
 
-    qa_prompt = f"""你是一位资深 QA 工程师。请为以下 Slice 生成测试计划和测试报告。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 分支: {slice_obj['branch_name']}
-- 风险级别: {slice_obj['risk_level']}
-
-验收标准：
-{ac_text}
-
-请生成包含以下内容的测试报告：
-
-# 测试报告
-
-## Slice 概述
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 分支: {slice_obj['branch_name']}
-
-## 验收标准映射
-{ac_text}
-
-## 测试策略
-### 1. 单元测试
-- 测试框架
-- 覆盖率要求
-
-### 2. 集成测试
-- API 测试
-- 数据库测试
-
-### 3. 端到端测试
-- 关键业务流程
-
-## 测试执行
-```bash
-make test                    # 运行所有测试
-pytest tests/unit -q        # 单元测试
-pytest tests/integration -q # 集成测试
-```
-
-## 测试用例
-- 正常场景
-- 边界条件
-- 异常处理
-
-## 缺陷报告模板
-
-请确保测试计划全面、可执行。"""
+    qa_prompt = _render_prompt("qa", slice_context=_slice_context_block(slice_obj, ac_list))
 
     qa_response = llm.chat_simple(
         system_prompt="你是一位经验丰富的 QA 工程师，擅长设计全面的测试策略和执行测试计划。你的输出应该专业、详细且可执行。",
@@ -707,105 +538,155 @@ def run_ops(
 
     llm = get_llm_client(user_id=user_id, project_id=project_id)
 
-    ops_prompt = f"""你是一位资深运维工程师。请为以下 Slice 生成运维文档。
-
-Slice 信息：
-- ID: {slice_obj['id']}
-- 标题: {slice_obj['title']}
-- 分支: {slice_obj['branch_name']}
-- 范围: {slice_obj['scope']}
-
-请生成以下运维文档：
-
-## 1. 部署文档 (DEPLOY.md)
-### 部署架构
-### 部署步骤
-### 环境变量配置
-### 数据库迁移
-### 回滚方案
-
-## 2. 运维手册 (RUNBOOK.md)
-### 服务启动/停止
-### 日常巡检
-### 日志查看
-### 常见问题处理
-### 故障排查流程
-
-## 3. 资源清单 (RESOURCES.md)
-### 服务器资源
-### 依赖服务
-### 网络配置
-### 存储需求
-
-## 4. 运维报告 (ops_report.md)
-### 监控指标
-### 告警规则
-### 性能基线
-### 容量规划
-
-请确保运维文档详细、可执行。"""
-
-    ops_response = llm.chat_simple(
-        system_prompt="你是一位经验丰富的运维工程师，擅长编写清晰的运维文档和设计可靠的运维方案。你的输出应该专业、详细且可执行。",
-        user_prompt=ops_prompt,
-        max_tokens=4096,
+    # Skip the LLM entirely when the existing docs were generated from the
+    # exact same slice payload (marker embedded on the previous run).
+    marker = f"<!-- hash:{_content_hash(slice_obj, ac_list, 'ops', llm.model)} -->"
+    if _files_current(worktree, paths, marker):
+        return AgentOutput(paths, "Ops docs unchanged; skipped regeneration (content hash match).")
+
+    ops_system = "你是一位经验丰富的运维工程师，擅长编写清晰的运维文档和设计可靠的运维方案。你的输出应该专业、详细且可执行。"
+
+    # One prompt per document instead of a monolithic prompt that needs
+    # post-hoc section splitting; the four docs are independent, so the
+    # requests run concurrently.
+    doc_specs = [
+        (paths[0], "Deploy", "ops_deploy"),
+        (paths[1], "Runbook", "ops_runbook"),
+        (paths[2], "Resources", "ops_resources"),
+        (paths[3], "Ops Report", "ops_report"),
+    ]
+
+    slice_context = _slice_context_block(slice_obj, ac_list)
+    prompts = [
+        (ops_system, _render_prompt(template, slice_context=slice_context))
+        for _, _, template in doc_specs
+    ]
+
+    responses = _chat_concurrently(llm, prompts)
+
+    sid = slice_obj["id"]
+    branch = slice_obj["branch_name"]
+    generated_at = now_iso()
+    for (path, title, _), response in zip(doc_specs, responses):
+        if response.error:
+            write_file(worktree, path, f"# {title}\nSlice {sid}\n\n[LLM Error: {response.error}]\n")
+        else:
+            header = f"# {title}\n\nSlice {sid}\nBranch: {branch}\n\nGenerated at: {generated_at}\n\n"
+            # Error fallbacks carry no marker so a retry regenerates them
+            write_file(worktree, path, f"{header}{response.content}\n\n{marker}\n")
+
+    return AgentOutput(paths, "Generated ops docs using GLM-4.7.")
+
+# Sub-task sections of the batched all-roles prompt: section number,
+# owning role, output path, document title, and a one-line instruction.
+# Sections 1-4 are upserted into shared docs; the rest are whole files.
+_BATCH_TASKS = [
+    (1, "pm", "docs/PRD.md", "产品需求文档（PRD）",
+     "生成完整的产品需求文档，包含背景与目标、用户故事、业务规则/边界条件、非功能性需求。"),
+    (2, "pm", "docs/ACCEPTANCE.md", "验收标准文档",
+     "为每个验收标准生成详细的验收条件和验证方式，确保具体、可测量、可验证。"),
+    (3, "architect", "docs/DESIGN.md", "技术设计文档",
+     "生成技术设计文档，包含系统架构、API 契约、数据模型、幂等/超时/重试/限流、安全设计、可观测性。"),
+    (4, "architect", "docs/TEST_STRATEGY.md", "测试策略文档",
+     "生成测试策略，包含测试金字塔、测试工具、测试命令、覆盖率要求。"),
+    (5, "dev", "reports/dev_report.md", "开发报告",
+     "生成开发报告，包含 Slice 概述、验收标准清单、实施计划、质量门禁、开发注意事项。"),
+    (6, "qa", "reports/test_report.md", "测试报告",
+     "生成测试计划和测试报告，包含验收标准映射、测试策略、测试执行、测试用例。"),
+    (7, "ops", "docs/DEPLOY.md", "部署文档",
+     "生成部署文档，包含部署架构、部署步骤、环境变量配置、数据库迁移、回滚方案。"),
+    (8, "ops", "docs/RUNBOOK.md", "运维手册",
+     "生成运维手册，包含服务启动/停止、日常巡检、日志查看、常见问题处理、故障排查流程。"),
+    (9, "ops", "docs/RESOURCES.md", "资源清单",
+     "生成资源清单，包含服务器资源、依赖服务、网络配置、存储需求。"),
+    (10, "ops", "reports/ops_report.md", "运维报告",
+     "生成运维报告，包含监控指标、告警规则、性能基线、容量规划。"),
+]
+
+_BATCH_SYSTEM_PROMPT = (
+    "你是一个多角色软件交付助手，同时扮演产品经理、架构师、开发工程师、"
+    "测试工程师和运维工程师。用户消息包含一段共享上下文和若干编号子任务。"
+    "请依次完成每个子任务，并且在每个子任务的回答之前单独输出一行分隔标记 "
+    "===[n]===（n 为子任务编号），例如 ===[1]===。标记行之外不要输出任何"
+    "额外的解释文字。每个回答使用 Markdown 格式，内容专业、完整、可执行。"
+)
+
+_BATCH_SPLIT = re.compile(r"^===\[(\d+)\]===\s*$", re.M)
+
+
+def run_all_for_slice(
+    worktree: Path,
+    slice_obj: dict[str, Any],
+    ac_list: list[dict[str, Any]],
+    user_id: Optional[int] = None,
+    project_id: Optional[int] = None,
+) -> AgentOutput:
+    """
+    Generate all role documents for a slice in a single batched LLM call.
+
+    The ten per-role prompts repeat the same slice context verbatim, so
+    packing them into one request pays the prefill cost once instead of
+    ten times. The model emits sections delimited by ===[n]=== markers
+    which are split out and dispatched to the same files the individual
+    runners write.
+    """
+    for role in ("pm", "architect", "dev", "qa", "ops"):
+        _assert_allowed(role, [p for _, r, p, _, _ in _BATCH_TASKS if r == role])
+
+    # Static task list first, dynamic slice context last, so the prompt
+    # prefix stays byte-identical across slices (provider prompt caching).
+    task_lines = "\n".join(
+        f"[{n}] {title}（{path}）：{instruction}"
+        for n, _, path, title, instruction in _BATCH_TASKS
+    )
+    user_prompt = (
+        f"子任务列表：\n{task_lines}\n\n"
+        f"请完成全部 {len(_BATCH_TASKS)} 个子任务，每个回答之前单独一行输出 ===[n]=== 标记。"
+        f"{_CONTEXT_SEP}{_slice_context_block(slice_obj, ac_list)}"
     )
 
-    if ops_response.error:
-        write_file(worktree, paths[0], f"# Deploy\nSlice {slice_obj['id']}\nBranch {slice_obj['branch_name']}\n\n[LLM Error: {ops_response.error}]\n")
-        write_file(worktree, paths[1], f"# Runbook\nSlice {slice_obj['id']}\n\n[LLM Error: {ops_response.error}]\n")
-        write_file(worktree, paths[2], f"# Resources\nSlice {slice_obj['id']}\n\n[LLM Error: {ops_response.error}]\n")
-        write_file(worktree, paths[3], f"# Ops Report\nSlice {slice_obj['id']}\n\n[LLM Error: {ops_response.error}]\n")
-    else:
-        # Split the response into separate documents
-        content = ops_response.content
-
-        # Extract sections
-        deploy_content = f"# Deploy\n\nSlice {slice_obj['id']}\nBranch: {slice_obj['branch_name']}\n\nGenerated at: {now_iso()}\n\n"
-        runbook_content = f"# Runbook\n\nSlice {slice_obj['id']}\nBranch: {slice_obj['branch_name']}\n\nGenerated at: {now_iso()}\n\n"
-        resources_content = f"# Resources\n\nSlice {slice_obj['id']}\nBranch: {slice_obj['branch_name']}\n\nGenerated at: {now_iso()}\n\n"
-        ops_report_content = f"# Ops Report\n\nSlice {slice_obj['id']}\nBranch: {slice_obj['branch_name']}\n\nGenerated at: {now_iso()}\n\n"
-
-        # Add the AI generated content
-        current_section = None
-        current_content = []
-        for line in content.split('\n'):
-            if line.startswith('## 1. 部署文档') or line.startswith('# 部署文档'):
-                current_section = 'deploy'
-            elif line.startswith('## 2. 运维手册') or line.startswith('# 运维手册'):
-                current_section = 'runbook'
-            elif line.startswith('## 3. 资源清单') or line.startswith('# 资源清单'):
-                current_section = 'resources'
-            elif line.startswith('## 4. 运维报告') or line.startswith('# 运维报告'):
-                current_section = 'ops_report'
-            elif current_section:
-                current_content.append(line)
-
-            if current_section == 'deploy' and line.startswith('## 2.'):
-                deploy_content += '\n'.join(current_content[:-1])
-                current_content = []
-            elif current_section == 'runbook' and line.startswith('## 3.'):
-                runbook_content += '\n'.join(current_content[:-1])
-                current_content = []
-            elif current_section == 'resources' and line.startswith('## 4.'):
-                resources_content += '\n'.join(current_content[:-1])
-                current_content = []
-
-        # Add remaining content
-        if current_section == 'deploy':
-            deploy_content += '\n'.join(current_content)
-        elif current_section == 'runbook':
-            runbook_content += '\n'.join(current_content)
-        elif current_section == 'resources':
-            resources_content += '\n'.join(current_content)
-        elif current_section == 'ops_report':
-            ops_report_content += '\n'.join(current_content)
-
-        write_file(worktree, paths[0], deploy_content)
-        write_file(worktree, paths[1], runbook_content)
-        write_file(worktree, paths[2], resources_content)
-        write_file(worktree, paths[3], ops_report_content)
+    llm = get_llm_client(user_id=user_id, project_id=project_id)
+    response = llm.chat_simple(
+        system_prompt=_BATCH_SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        max_tokens=8192,
+    )
+
+    sections: dict[int, str] = {}
+    if not response.error:
+        parts = _BATCH_SPLIT.split(response.content)
+        # parts[0] is any preamble; afterwards indices and bodies alternate
+        for index, body in zip(parts[1::2], parts[2::2]):
+            sections[int(index)] = body.strip()
+
+    sid = slice_obj["id"]
+    branch = slice_obj["branch_name"]
+    start = f"<!-- slice:{sid}:start -->"
+    end = f"<!-- slice:{sid}:end -->"
+    generated_at = now_iso()
+
+    for n, _, path, title, _ in _BATCH_TASKS:
+        content = sections.get(n)
+        if content is None:
+            error = response.error or f"section [{n}] missing from batched response"
+            content = f"[LLM Error: {error}]"
+        if path.startswith("docs/") and n <= 4:
+            upsert_block(worktree / path, start, end, content)
+        else:
+            header = f"# {title}\n\nSlice {sid}\nBranch: {branch}\n\nGenerated at: {generated_at}\n\n"
+            write_file(worktree, path, header + content)
+
+    return AgentOutput(
+        [path for _, _, path, _, _ in _BATCH_TASKS],
+        "Generated all role docs in one batched GLM-4.7 call.",
+    )
 
-    return AgentOutput(paths, "Generated ops docs using GLM-4.7.")
 
-ROLE_RUNNERS = {"pm": run_pm, "architect": run_architect, "dev": run_dev, "qa": run_qa, "ops": run_ops}
+ROLE_RUNNERS = {
+    "pm": run_pm,
+    "architect": run_architect,
+    "dev": run_dev,
+    "qa": run_qa,
+    "ops": run_ops,
+    "all": run_all_for_slice,
+}
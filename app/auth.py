@@ -1,32 +1,101 @@
 from __future__ import annotations
+import binascii
+import functools
 import hashlib
 import hmac
 import os
 from typing import Optional
 
 from fastapi import Request
+
+try:
+    from argon2.low_level import hash_secret_raw, Type as Argon2Type
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
 from .db import fetchone, execute
 from .utils import now_iso
 
 PBKDF2_ITERS = 120_000
 
+# scrypt cost parameters (n=2**14, r=8, p=1 is the common interactive-login
+# setting); memory-hard, so cheaper per unit of attacker resistance than
+# iterating SHA256.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# argon2id parameters: 2 passes over 64 MiB, single lane.
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_KIB = 64 * 1024
+ARGON2_PARALLELISM = 1
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * 1024 * 1024, dklen=dklen,
+    )
+
+def _argon2(password: str, salt: bytes, t: int, m: int, p: int, dklen: int) -> bytes:
+    return hash_secret_raw(
+        password.encode("utf-8"), salt,
+        time_cost=t, memory_cost=m, parallelism=p,
+        hash_len=dklen, type=Argon2Type.ID,
+    )
+
 def make_password_hash(password: str) -> str:
     salt = os.urandom(16)
-    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERS, dklen=32)
-    return f"pbkdf2_sha256${PBKDF2_ITERS}${salt.hex()}${digest.hex()}"
+    if ARGON2_AVAILABLE:
+        digest = _argon2(password, salt, ARGON2_TIME_COST, ARGON2_MEMORY_KIB, ARGON2_PARALLELISM, 32)
+        return f"argon2${ARGON2_TIME_COST}:{ARGON2_MEMORY_KIB}:{ARGON2_PARALLELISM}${salt.hex()}${digest.hex()}"
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P, 32)
+    return f"scrypt${SCRYPT_N}:{SCRYPT_R}:{SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+@functools.lru_cache(maxsize=4096)
+def _parse_hash(stored: str) -> Optional[tuple[str, tuple[int, ...], bytes, bytes]]:
+    """
+    Parse a stored hash into (algo, params, salt, expected) once per row.
+
+    The stored string is immutable per user, so the split/hex-decode/int
+    work is cached; only the stored hash is memoized, never the password.
+    Returns None for malformed rows.
+    """
+    try:
+        algo, params_s, salt_hex, digest_hex = stored.split("$", 3)
+        params = tuple(int(x) for x in params_s.split(":"))
+        salt = binascii.a2b_hex(salt_hex)
+        expected = binascii.a2b_hex(digest_hex)
+    except (ValueError, binascii.Error):
+        return None
+    return algo, params, salt, expected
 
 def verify_password(password: str, stored: str) -> bool:
+    # Dispatch on the algo prefix so hashes created before the scrypt/argon2
+    # switch (pbkdf2_sha256 rows) keep validating with their stored params.
+    parsed = _parse_hash(stored)
+    if parsed is None:
+        return False
+    algo, params, salt, expected = parsed
     try:
-        algo, iters_s, salt_hex, digest_hex = stored.split("$", 3)
-        if algo != "pbkdf2_sha256":
+        if algo == "pbkdf2_sha256" and len(params) == 1:
+            got = hashlib.pbkdf2_hmac(
+                "sha256", password.encode("utf-8"), salt, params[0], dklen=len(expected)
+            )
+        elif algo == "scrypt" and len(params) == 3:
+            n, r, p = params
+            got = _scrypt(password, salt, n, r, p, len(expected))
+        elif algo == "argon2" and len(params) == 3:
+            if not ARGON2_AVAILABLE:
+                return False
+            t, m, p = params
+            got = _argon2(password, salt, t, m, p, len(expected))
+        else:
             return False
-        iters = int(iters_s)
-        salt = bytes.fromhex(salt_hex)
-        expected = bytes.fromhex(digest_hex)
-        got = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iters, dklen=len(expected))
-        return hmac.compare_digest(got, expected)
-    except Exception:
+    except ValueError:
+        # Corrupt cost parameters (e.g. non-power-of-two scrypt n)
         return False
+    return hmac.compare_digest(got, expected)
 
 def get_current_user(request: Request) -> Optional[dict]:
     uid = request.session.get("user_id")
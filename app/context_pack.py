@@ -1,8 +1,17 @@
 from __future__ import annotations
+import dataclasses
 import os, subprocess
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
 from .utils import clamp_text, safe_relpath
 
 DEFAULT_ALWAYS_FILES = [
@@ -15,50 +24,159 @@ DEFAULT_ALWAYS_FILES = [
     "Makefile",
 ]
 
+# Minimal child environment built once at import: git only needs PATH/HOME
+# plus the prompt suppression, so there's no point copying the full
+# os.environ into a fresh dict on every call (and nothing else leaks in).
+_GIT_ENV = {
+    "GIT_TERMINAL_PROMPT": "0",
+    "PATH": os.environ.get("PATH", ""),
+    "HOME": os.environ.get("HOME", ""),
+    "LANG": "C",
+}
+
 def _run(cmd: list[str], cwd: Path) -> str:
     p = subprocess.run(
         cmd,
         cwd=str(cwd),
         stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
+        stderr=subprocess.DEVNULL,
         text=True,
-        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        env=_GIT_ENV,
     )
     return p.stdout
 
+# Repository handles are cheap to keep open and save re-walking refs on
+# every context pack build for the same worktree.
+_repo_cache: dict[str, Any] = {}
+
+def _git_log_oneline(worktree_path: Path, limit: int = 20) -> str:
+    """
+    Return the last `limit` commits as oneline entries.
+
+    Uses libgit2 in-process when pygit2 is installed (skips the
+    fork+exec and git startup cost of a subprocess); falls back to
+    `git log` for plain installs or worktrees pygit2 can't resolve.
+    """
+    if PYGIT2_AVAILABLE:
+        try:
+            key = str(worktree_path)
+            repo = _repo_cache.get(key)
+            if repo is None:
+                repo = pygit2.Repository(key)
+                _repo_cache[key] = repo
+            lines = []
+            for i, commit in enumerate(repo.walk(repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL)):
+                if i >= limit:
+                    break
+                subject = commit.message.splitlines()[0] if commit.message else ""
+                lines.append(f"{str(commit.id)[:7]} {subject}")
+            return "\n".join(lines)
+        except Exception:
+            # Linked worktrees or unborn HEADs that libgit2 can't resolve
+            pass
+    return _run(["git", "log", "-n", str(limit), "--oneline"], cwd=worktree_path)
+
+# Files larger than this are skipped outright; their excerpt could never
+# use more than the first few KB anyway.
+MAX_EXCERPT_FILE_BYTES = 256 * 1024
+
 def _excerpt_file(path: Path, max_lines: int = 200) -> str:
+    # Bounded line reader: stop as soon as max_lines are consumed instead
+    # of decoding the whole file and throwing away everything after the
+    # first 200 lines.
     try:
-        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
-        return "\n".join(lines[:max_lines])
+        out: list[str] = []
+        with path.open("r", encoding="utf-8", errors="replace") as f:
+            for i, line in enumerate(f):
+                if i >= max_lines:
+                    break
+                out.append(line.rstrip("\n"))
+        return "\n".join(out)
     except Exception as e:
         return f"<failed to read {path}: {e}>"
 
-def build_context_pack(worktree_path: Path, slice_obj: dict[str, Any], ac_list: list[dict[str, Any]]) -> dict[str, Any]:
-    files: list[Path] = []
-    for f in DEFAULT_ALWAYS_FILES:
-        p = worktree_path / f
-        if p.exists() and p.is_file():
-            files.append(p)
-
-    git_log = _run(["git", "log", "-n", "20", "--oneline"], cwd=worktree_path)
-
-    file_entries = []
-    for p in files[:20]:
-        rel = safe_relpath(p, worktree_path)
-        file_entries.append({"path": rel, "excerpt": clamp_text(_excerpt_file(p), 7000)})
-
-    return {
-        "slice": {
-            "id": slice_obj["id"],
-            "title": slice_obj["title"],
-            "scope": slice_obj["scope"],
-            "out_of_scope": slice_obj["out_of_scope"],
-            "risk_level": slice_obj["risk_level"],
-            "status": slice_obj["status"],
-            "branch_name": slice_obj["branch_name"],
-        },
-        "acceptance_criteria": [{"code": a["code"], "text": a["text"], "verification": a["verification"]} for a in ac_list],
-        "repo": {"worktree_path": str(worktree_path), "git_log": clamp_text(git_log, 9000)},
-        "files": file_entries,
-        "suggested_commands": ["make lint", "make type", "make contract", "make test"],
-    }
+# Slotted, frozen value objects instead of nested dict literals: packs can
+# be retained for the whole agent run, and attribute access via slot
+# offsets is cheaper than per-key hash lookups.
+
+@dataclass(slots=True, frozen=True)
+class SlicePack:
+    id: int
+    title: str
+    scope: str
+    out_of_scope: str
+    risk_level: str
+    status: str
+    branch_name: str
+
+@dataclass(slots=True, frozen=True)
+class AcItem:
+    code: str
+    text: str
+    verification: str
+
+@dataclass(slots=True, frozen=True)
+class FileEntry:
+    path: str
+    excerpt: str
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "excerpt", clamp_text(self.excerpt, 7000))
+
+@dataclass(slots=True, frozen=True)
+class ContextPack:
+    slice: SlicePack
+    acceptance_criteria: tuple[AcItem, ...]
+    worktree_path: str
+    git_log: str
+    files: tuple[FileEntry, ...]
+    suggested_commands: tuple[str, ...] = ("make lint", "make type", "make contract", "make test")
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "git_log", clamp_text(self.git_log, 9000))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the JSON-serializable shape stored in content_json."""
+        return {
+            "slice": dataclasses.asdict(self.slice),
+            "acceptance_criteria": [dataclasses.asdict(a) for a in self.acceptance_criteria],
+            "repo": {"worktree_path": self.worktree_path, "git_log": self.git_log},
+            "files": [dataclasses.asdict(f) for f in self.files],
+            "suggested_commands": list(self.suggested_commands),
+        }
+
+def _file_entry(p: Path, worktree_path: Path) -> FileEntry:
+    rel = safe_relpath(p, worktree_path)
+    try:
+        too_large = p.stat().st_size > MAX_EXCERPT_FILE_BYTES
+    except OSError:
+        too_large = False
+    if too_large:
+        excerpt = f"<file too large: {rel}>"
+    else:
+        excerpt = _excerpt_file(p)
+    return FileEntry(path=rel, excerpt=excerpt)
+
+def build_context_pack(worktree_path: Path, slice_obj: dict[str, Any], ac_list: list[dict[str, Any]]) -> ContextPack:
+    files = tuple(islice(
+        (p for f in DEFAULT_ALWAYS_FILES if (p := worktree_path / f).is_file()),
+        20,
+    ))
+
+    return ContextPack(
+        slice=SlicePack(
+            id=slice_obj["id"],
+            title=slice_obj["title"],
+            scope=slice_obj["scope"],
+            out_of_scope=slice_obj["out_of_scope"],
+            risk_level=slice_obj["risk_level"],
+            status=slice_obj["status"],
+            branch_name=slice_obj["branch_name"],
+        ),
+        acceptance_criteria=tuple(
+            AcItem(code=a["code"], text=a["text"], verification=a["verification"]) for a in ac_list
+        ),
+        worktree_path=str(worktree_path),
+        git_log=_git_log_oneline(worktree_path),
+        files=tuple(_file_entry(p, worktree_path) for p in files),
+    )
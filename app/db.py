@@ -5,12 +5,15 @@ Supports both SQLite (development) and PostgreSQL (production).
 Maintains backward-compatible API for existing code.
 """
 from __future__ import annotations
+import contextvars
+import functools
 import os
-from typing import Any, Iterable, Optional
+import re
+from typing import Any, Iterable, Mapping, Optional
 from contextlib import contextmanager
 from pathlib import Path
 
-from sqlalchemy import create_engine, text, Column, Integer, String, event, inspect
+from sqlalchemy import and_, bindparam, create_engine, select, text, Column, Integer, String, event, inspect
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool, QueuePool
 
@@ -27,9 +30,13 @@ DATABASE_URL = os.getenv(
 
 # Create engine with appropriate settings per database type
 if DATABASE_URL.startswith("sqlite"):
+    # cached_statements raises sqlite3's per-connection prepared-statement
+    # cache above the default 128: the app's SQL vocabulary is a fixed set
+    # of strings, so repeat queries skip the parse/plan step entirely.
+    _sqlite_connect_args = {"check_same_thread": False, "cached_statements": 256}
     engine = create_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False},
+        connect_args=_sqlite_connect_args,
         poolclass=StaticPool,  # SQLite doesn't need connection pooling
         echo=False,  # Set to True for SQL query logging
     )
@@ -40,16 +47,48 @@ if DATABASE_URL.startswith("sqlite"):
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.execute("PRAGMA journal_mode=WAL")  # Enable WAL mode for better concurrency
         cursor.close()
+
+    # WAL supports any number of concurrent readers alongside the single
+    # writer, but StaticPool funnels everything through one shared
+    # connection. Reads go through their own pooled engine (query_only
+    # connections on WAL snapshots) so handler threads can actually run
+    # fetchone/fetchall in parallel; writes stay on the StaticPool engine.
+    read_engine = create_engine(
+        DATABASE_URL,
+        connect_args=_sqlite_connect_args,
+        poolclass=QueuePool,
+        pool_size=8,
+        max_overflow=8,
+        pool_use_lifo=True,  # Reuse the hottest connection first
+        echo=False,
+    )
+
+    @event.listens_for(read_engine, "connect")
+    def set_sqlite_read_pragma(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
 else:
     # PostgreSQL and other databases
+    _engine_kwargs: dict[str, Any] = {}
+    if DATABASE_URL.startswith("postgresql"):
+        # Let executemany batches go through psycopg2's execute_values
+        # (one multi-row VALUES statement) instead of one round-trip per
+        # parameter set.
+        _engine_kwargs["executemany_mode"] = "values_plus_batch"
     engine = create_engine(
         DATABASE_URL,
         poolclass=QueuePool,
         pool_size=5,
         max_overflow=10,
         pool_pre_ping=True,  # Verify connections before using
+        pool_use_lifo=True,  # Reuse the hottest connection first
         echo=False,
+        **_engine_kwargs,
     )
+    # QueuePool already parallelizes; no separate read engine needed.
+    read_engine = engine
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -72,51 +111,86 @@ def init_db() -> None:
     _run_migrations()
 
 
+# Set once _run_migrations has completed so repeated init_db calls (e.g.
+# during tests) don't redo schema introspection and DDL.
+_migrated = False
+
+
 def _run_migrations() -> None:
     """
     Run database migrations for backward compatibility.
 
     These migrations add columns that were added after initial schema.
+    All statements run in a single transaction, so startup pays one
+    commit (one fsync on SQLite) instead of one per statement.
     """
-    with get_session() as session:
-        # Check if projects table exists
-        inspector = inspect(engine)
-        if "projects" in inspector.get_table_names():
-            columns = [c["name"] for c in inspector.get_columns("projects")]
-
-            # Add github_owner if not exists
-            if "github_owner" not in columns:
-                with engine.connect() as conn:
-                    conn.execute(text("ALTER TABLE projects ADD COLUMN github_owner TEXT"))
-                    conn.commit()
-
-            # Add github_repo if not exists
-            if "github_repo" not in columns:
-                with engine.connect() as conn:
-                    conn.execute(text("ALTER TABLE projects ADD COLUMN github_repo TEXT"))
-                    conn.commit()
-
-        # Check slices table for new columns
-        if "slices" in inspector.get_table_names():
-            columns = [c["name"] for c in inspector.get_columns("slices")]
-
-            # Add pr_number if not exists
-            if "pr_number" not in columns:
-                with engine.connect() as conn:
-                    conn.execute(text("ALTER TABLE slices ADD COLUMN pr_number INTEGER"))
-                    conn.commit()
-
-            # Add pr_url if not exists
-            if "pr_url" not in columns:
-                with engine.connect() as conn:
-                    conn.execute(text("ALTER TABLE slices ADD COLUMN pr_url TEXT"))
-                    conn.commit()
-
-            # Add adse_enabled if not exists
-            if "adse_enabled" not in columns:
-                with engine.connect() as conn:
-                    conn.execute(text("ALTER TABLE slices ADD COLUMN adse_enabled INTEGER NOT NULL DEFAULT 0"))
-                    conn.commit()
+    global _migrated
+    if _migrated:
+        return
+
+    # Collect the needed DDL first with a single inspector pass (the
+    # inspector is dialect-portable, unlike PRAGMA table_info)...
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    statements: list[str] = []
+
+    if "projects" in tables:
+        columns = {c["name"] for c in inspector.get_columns("projects")}
+        if "github_owner" not in columns:
+            statements.append("ALTER TABLE projects ADD COLUMN github_owner TEXT")
+        if "github_repo" not in columns:
+            statements.append("ALTER TABLE projects ADD COLUMN github_repo TEXT")
+
+    if "slices" in tables:
+        columns = {c["name"] for c in inspector.get_columns("slices")}
+        if "pr_number" not in columns:
+            statements.append("ALTER TABLE slices ADD COLUMN pr_number INTEGER")
+        if "pr_url" not in columns:
+            statements.append("ALTER TABLE slices ADD COLUMN pr_url TEXT")
+        if "adse_enabled" not in columns:
+            statements.append("ALTER TABLE slices ADD COLUMN adse_enabled INTEGER NOT NULL DEFAULT 0")
+
+    # Content-addressed LLM response cache (see llm_cache.py). A plain
+    # key/value table, so it's created here rather than in models.
+    statements.append(
+        "CREATE TABLE IF NOT EXISTS llm_cache ("
+        "key TEXT PRIMARY KEY, response TEXT, created_at TEXT)"
+    )
+
+    # Unique index so p2c_tracking dedup is an index seek handled by the
+    # database (pre-existing tables miss the model-level constraint)
+    if "p2c_tracking" in tables:
+        statements.append(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_p2c_slice_inst "
+            "ON p2c_tracking(slice_id, instruction_id)"
+        )
+
+    # Unique index so invitation lookup/redemption by code is an index
+    # seek (the model declares it, but databases created before that
+    # constraint miss the index)
+    if "invitations" in tables:
+        statements.append(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_invitations_code "
+            "ON invitations(code)"
+        )
+        # Compound indexes matching the list queries (filter by id,
+        # newest first) so those pages read the index in order instead
+        # of sorting the whole table
+        statements.append(
+            "CREATE INDEX IF NOT EXISTS ix_invitations_project_created "
+            "ON invitations(project_id, created_at DESC)"
+        )
+        statements.append(
+            "CREATE INDEX IF NOT EXISTS ix_invitations_user_created "
+            "ON invitations(created_by_user_id, created_at DESC)"
+        )
+
+    # ...then apply them all inside one BEGIN/COMMIT.
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+    _migrated = True
 
 
 @contextmanager
@@ -140,24 +214,135 @@ def get_session():
         session.close()
 
 
+# A dashboard request runs several fetchone/fetchall calls for auth,
+# sidebar and page data; checking a connection out of the pool for each
+# one pays checkout overhead and pool-lock contention per query. Within
+# a request_connection() scope the first read lazily checks out one
+# pooled connection and every later read reuses it via a lockless
+# ContextVar lookup. Outside any scope (background jobs, scripts) the
+# helpers fall back to a per-call checkout as before.
+_request_conn: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "request_conn", default=None
+)
+
+# Request-scoped memo for the ORM helpers below: repeated get_by_id /
+# get_all calls within one request collapse to a dict lookup. The cache
+# dies with the request, so there is no cross-request staleness to
+# manage; writes through create/update/delete evict their model's
+# entries for consistency within the request.
+_request_cache: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "request_cache", default=None
+)
+
+
+@contextmanager
+def request_connection():
+    """Scope a shared read connection and query memo to the current context."""
+    holder: list = []
+    conn_token = _request_conn.set(holder)
+    cache_token = _request_cache.set({})
+    try:
+        yield
+    finally:
+        _request_cache.reset(cache_token)
+        _request_conn.reset(conn_token)
+        if holder:
+            holder[0].close()
+
+
+def _evict_cached(model: type) -> None:
+    """Drop all request-cached entries for a model after a write."""
+    cache = _request_cache.get()
+    if cache:
+        for key in [k for k in cache if k[0] is model]:
+            del cache[key]
+
+
+@contextmanager
+def _read_connection(conn=None):
+    """Yield a read connection: explicit > request-scoped > fresh checkout."""
+    if conn is None:
+        holder = _request_conn.get()
+        if holder is not None:
+            if not holder:
+                holder.append(read_engine.connect())
+            conn = holder[0]
+    if conn is not None:
+        yield conn
+    else:
+        with read_engine.connect() as fresh:
+            yield fresh
+
+
 # ============================================================================
 # BACKWARD COMPATIBLE API
 # These functions maintain the same API as the old sqlite3 implementation
 # ============================================================================
 
+@functools.lru_cache(maxsize=512)
+def _compile_query(query: str):
+    """TextClause plus bind names for a SQL string, cached per string.
+
+    The compat API keeps sqlite3's qmark convention (`?` + positional
+    params), but SQLAlchemy text() only understands :name binds, so each
+    `?` outside a string literal is rewritten to a generated :p<N> bind
+    here — once per distinct SQL string thanks to the cache. Queries
+    written with :name binds pass through untouched.
+    """
+    out: list[str] = []
+    names: list[str] = []
+    quote = None
+    for ch in query:
+        if quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+            out.append(ch)
+        elif ch == "?":
+            name = f"p{len(names)}"
+            names.append(name)
+            out.append(f":{name}")
+        else:
+            out.append(ch)
+    return text("".join(out)), tuple(names)
+
+
+def _bind(query: str, params: Iterable[Any]):
+    """Compile a query and zip positional params into its named binds."""
+    stmt, names = _compile_query(query)
+    if isinstance(params, Mapping):
+        return stmt, params
+    return stmt, dict(zip(names, params))
+
+
 class Row:
     """
     Compatibility wrapper for SQLAlchemy rows.
 
-    Mimics sqlite3.Row interface for backward compatibility.
+    Mimics sqlite3.Row interface for backward compatibility. Slotted to
+    skip the per-instance __dict__ (fetchall can return thousands of
+    rows), with the positional tuple view built lazily on first integer
+    access instead of rebuilding a list per lookup. Wraps any mapping,
+    so callers can hand it SQLAlchemy's RowMapping view directly
+    without copying into a fresh dict.
     """
-    def __init__(self, data: dict):
+    __slots__ = ("_data", "_values")
+
+    def __init__(self, data: Mapping[str, Any]):
         self._data = data
+        self._values: Optional[tuple] = None
+
+    def _value_tuple(self) -> tuple:
+        values = self._values
+        if values is None:
+            values = self._values = tuple(self._data.values())
+        return values
 
     def __getitem__(self, key: str | int) -> Any:
         if isinstance(key, int):
-            # Convert integer index to key
-            return list(self._data.values())[key]
+            return self._value_tuple()[key]
         return self._data.get(key)
 
     def keys(self) -> list[str]:
@@ -167,10 +352,10 @@ class Row:
         return self._data.get(name)
 
     def __repr__(self) -> str:
-        return f"Row({self._data})"
+        return f"Row({dict(self._data)})"
 
     def __iter__(self):
-        return iter(self._data.values())
+        return iter(self._value_tuple())
 
     def __len__(self) -> int:
         return len(self._data)
@@ -183,54 +368,123 @@ def _row_to_dict(row) -> dict:
     return {c.key: getattr(row, c.key) for c in row.__table__.columns}
 
 
-def fetchone(query: str, params: Iterable[Any] = ()) -> Optional[Row]:
+def fetchone(query: str, params: Iterable[Any] = (), conn=None) -> Optional[Row]:
     """
     Execute a query and return a single row.
 
     Backward compatible with old sqlite3 implementation.
     """
-    with engine.connect() as conn:
-        result = conn.execute(text(query), tuple(params))
+    with _read_connection(conn) as conn:
+        stmt, bound = _bind(query, params)
+        result = conn.execute(stmt, bound)
         row = result.fetchone()
-        if row:
-            # Convert RowProxy to dict for compatibility
-            return Row(dict(row._asdict())) if hasattr(row, "_asdict") else Row(dict(row._mapping))
-        return None
+        # Wrap the row's mapping view directly; no per-row dict copy
+        return Row(row._mapping) if row else None
 
 
-def fetchall(query: str, params: Iterable[Any] = ()) -> list[Row]:
+def fetchall(query: str, params: Iterable[Any] = (), conn=None) -> list[Row]:
     """
     Execute a query and return all rows.
 
     Backward compatible with old sqlite3 implementation.
     """
-    with engine.connect() as conn:
-        result = conn.execute(text(query), tuple(params))
-        rows = result.fetchall()
-        return [
-            Row(dict(row._asdict())) if hasattr(row, "_asdict") else Row(dict(row._mapping))
-            for row in rows
-        ]
+    with _read_connection(conn) as conn:
+        stmt, bound = _bind(query, params)
+        result = conn.execute(stmt, bound)
+        return [Row(row._mapping) for row in result.fetchall()]
+
+
+def fetchiter(query: str, params: Iterable[Any] = (), chunk: int = 1000):
+    """
+    Execute a query and yield rows lazily in chunks.
+
+    Unlike fetchall, nothing is materialized up front: rows stream from
+    the driver `chunk` at a time (a server-side cursor on PostgreSQL),
+    so memory stays constant and the first row is available immediately.
+    Intended for exports and other large result sets; the connection is
+    held until the generator is exhausted or closed, so it deliberately
+    uses its own checkout rather than the request-scoped connection.
+    """
+    with read_engine.connect() as conn:
+        stmt, bound = _bind(query, params)
+        result = conn.execution_options(
+            stream_results=True, max_row_buffer=chunk
+        ).execute(stmt, bound)
+        for partition in result.partitions(chunk):
+            for row in partition:
+                yield Row(row._mapping)
+
+
+_IS_POSTGRES = DATABASE_URL.startswith("postgresql")
+
+# Tables without an integer id primary key (llm_cache keys on its hash),
+# where appending "RETURNING id" would be a column error.
+_NO_ID_TABLES = frozenset({"llm_cache"})
+
+_INSERT_TABLE_RE = re.compile(r'INSERT\s+(?:OR\s+\w+\s+)?INTO\s+"?(\w+)', re.IGNORECASE)
 
 
 def execute(query: str, params: Iterable[Any] = ()) -> int:
     """
     Execute a query and return the last row ID.
 
-    Backward compatible with old sqlite3 implementation.
+    Backward compatible with old sqlite3 implementation. On PostgreSQL,
+    where lastrowid is not populated, INSERT statements get a
+    "RETURNING id" appended (every model table has an integer id primary
+    key) so callers receive the new row id without a follow-up SELECT.
+    Inserts into tables listed in _NO_ID_TABLES skip the injection.
     """
+    if _IS_POSTGRES:
+        stripped = query.lstrip()
+        match = _INSERT_TABLE_RE.match(stripped)
+        if (
+            match
+            and match.group(1).lower() not in _NO_ID_TABLES
+            and "RETURNING" not in stripped.upper()
+        ):
+            with engine.connect() as conn:
+                stmt, bound = _bind(query + " RETURNING id", params)
+                result = conn.execute(stmt, bound)
+                conn.commit()
+                new_id = result.scalar()
+                return int(new_id) if new_id is not None else 0
+
     with engine.connect() as conn:
-        result = conn.execute(text(query), tuple(params))
+        stmt, bound = _bind(query, params)
+        result = conn.execute(stmt, bound)
         conn.commit()
 
-        # Try to get last inserted row id
-        # This works for SQLite and PostgreSQL (with RETURNING clause)
+        # SQLite populates lastrowid for inserts
         if hasattr(result, 'lastrowid') and result.lastrowid:
             return int(result.lastrowid)
 
-        # For PostgreSQL without RETURNING, we need a different approach
-        # This is a fallback - you may need to adjust based on your queries
+        # UPDATE/DELETE never populate lastrowid; the affected-row count
+        # lets callers write atomic conditional updates and test `rows > 0`
+        # instead of doing a SELECT-then-UPDATE pair.
+        rowcount = result.rowcount
+        return int(rowcount) if rowcount and rowcount > 0 else 0
+
+
+def execute_many(query: str, params_seq: Iterable[Iterable[Any]], page_size: int = 500) -> int:
+    """
+    Execute a query once per parameter set in a single transaction.
+
+    Backward compatible with sqlite3's executemany; returns the number
+    of parameter sets executed. Large batches are fed to the driver in
+    pages of `page_size` to bound statement size, but all pages commit
+    together (one fsync on SQLite). On PostgreSQL each page becomes a
+    single multi-row VALUES statement via the engine's execute_values
+    mode; on SQLite it is the native executemany.
+    """
+    params_list = [tuple(p) for p in params_seq]
+    if not params_list:
         return 0
+    stmt, names = _compile_query(query)
+    dict_params = [dict(zip(names, p)) for p in params_list]
+    with engine.begin() as conn:
+        for offset in range(0, len(dict_params), page_size):
+            conn.execute(stmt, dict_params[offset:offset + page_size])
+    return len(params_list)
 
 
 def execute_returning(query: str, params: Iterable[Any] = ()) -> Any:
@@ -240,12 +494,13 @@ def execute_returning(query: str, params: Iterable[Any] = ()) -> Any:
     Returns the inserted/updated row data.
     """
     with engine.connect() as conn:
-        result = conn.execute(text(query), tuple(params))
-        conn.commit()
+        stmt, bound = _bind(query, params)
+        result = conn.execute(stmt, bound)
+        # Fetch before commit: SQLite refuses to commit while a cursor
+        # still has pending rows.
         row = result.fetchone()
-        if row:
-            return Row(dict(row._asdict())) if hasattr(row, "_asdict") else Row(dict(row._mapping))
-        return None
+        conn.commit()
+        return Row(row._mapping) if row else None
 
 
 # ============================================================================
@@ -253,15 +508,38 @@ def execute_returning(query: str, params: Iterable[Any] = ()) -> Any:
 # These functions provide a more modern ORM interface
 # ============================================================================
 
+@functools.lru_cache(maxsize=256)
+def _filtered_select(model: type, keys: tuple[str, ...]):
+    """SELECT for a model filtered on `keys`, with bound parameters.
+
+    Cached per (model, filter shape) so repeated calls skip rebuilding
+    the expression tree; only the parameter values change per call.
+    """
+    stmt = select(model)
+    if keys:
+        stmt = stmt.where(and_(*(getattr(model, k) == bindparam(k) for k in keys)))
+    return stmt
+
+
 def get_by_id(model: type, id: int) -> Optional[models.Base]:
     """
     Get a record by ID using ORM.
 
     Usage:
         user = get_by_id(User, 1)
+
+    Within a request_connection() scope, repeated lookups for the same
+    (model, id) are served from the request cache.
     """
+    cache = _request_cache.get()
+    key = (model, id)
+    if cache is not None and key in cache:
+        return cache[key]
     with get_session() as session:
-        return session.query(model).filter(model.id == id).first()
+        obj = session.execute(_filtered_select(model, ("id",)), {"id": id}).scalars().first()
+    if cache is not None:
+        cache[key] = obj
+    return obj
 
 
 def get_all(model: type, **filters) -> list[models.Base]:
@@ -271,12 +549,20 @@ def get_all(model: type, **filters) -> list[models.Base]:
     Usage:
         users = get_all(User)
         active_projects = get_all(Project, owner_user_id=1)
+
+    Within a request_connection() scope, repeated calls with the same
+    filters are served from the request cache.
     """
+    cache = _request_cache.get()
+    key = (model, tuple(sorted(filters.items())))
+    if cache is not None and key in cache:
+        return cache[key]
     with get_session() as session:
-        query = session.query(model)
-        for key, value in filters.items():
-            query = query.filter(getattr(model, key) == value)
-        return query.all()
+        stmt = _filtered_select(model, tuple(sorted(filters)))
+        result = session.execute(stmt, filters).scalars().all()
+    if cache is not None:
+        cache[key] = result
+    return result
 
 
 def create(model: type, **kwargs) -> models.Base:
@@ -286,6 +572,7 @@ def create(model: type, **kwargs) -> models.Base:
     Usage:
         user = create(User, username="test", password_hash="...")
     """
+    _evict_cached(model)
     with get_session() as session:
         obj = model(**kwargs)
         session.add(obj)
@@ -301,6 +588,7 @@ def update(model: type, id: int, **kwargs) -> Optional[models.Base]:
     Usage:
         user = update(User, 1, username="new_name")
     """
+    _evict_cached(model)
     with get_session() as session:
         obj = session.query(model).filter(model.id == id).first()
         if obj:
@@ -318,6 +606,7 @@ def delete(model: type, id: int) -> bool:
     Usage:
         success = delete(User, 1)
     """
+    _evict_cached(model)
     with get_session() as session:
         obj = session.query(model).filter(model.id == id).first()
         if obj:
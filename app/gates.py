@@ -1,5 +1,6 @@
 from __future__ import annotations
-import os, subprocess
+import os, subprocess, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -11,17 +12,44 @@ class GateResult:
     status: str
     output: str
 
+# Only this much gate output is ever kept (the tail — that's where make
+# failures land). A verbose `make test` can emit far more than anyone
+# reads, and buffering it all just to clamp afterwards risks OOM.
+MAX_OUTPUT_CHARS = 15000
+
 def _run(cmd: list[str], cwd: Path, timeout_sec: int = 1800) -> tuple[int, str]:
-    p = subprocess.run(
+    p = subprocess.Popen(
         cmd,
         cwd=str(cwd),
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
         env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
-        timeout=timeout_sec,
     )
-    return p.returncode, p.stdout
+    state = {"tail": "", "truncated": False}
+
+    def drain() -> None:
+        # Stream in chunks, keeping a bounded window of the last output
+        for chunk in iter(lambda: p.stdout.read(4096), ""):
+            tail = state["tail"] + chunk
+            if len(tail) > MAX_OUTPUT_CHARS:
+                tail = tail[-MAX_OUTPUT_CHARS:]
+                state["truncated"] = True
+            state["tail"] = tail
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    try:
+        code = p.wait(timeout=timeout_sec)
+    except subprocess.TimeoutExpired:
+        p.kill()
+        p.wait()
+        raise
+    reader.join(timeout=30)
+    out = state["tail"]
+    if state["truncated"]:
+        out = "...<truncated>...\n" + out
+    return code, out
 
 DEFAULT_GATES = [
     ("lint", ["make", "lint"]),
@@ -30,12 +58,19 @@ DEFAULT_GATES = [
     ("test", ["make", "test"]),
 ]
 
+def _one_gate(name: str, cmd: list[str], worktree_path: Path) -> GateResult:
+    try:
+        code, out = _run(cmd, cwd=worktree_path)
+        return GateResult(name, "pass" if code == 0 else "fail", out)
+    except Exception as e:
+        return GateResult(name, "fail", clamp_text(str(e), MAX_OUTPUT_CHARS))
+
 def run_gates(worktree_path: Path) -> list[GateResult]:
-    res = []
-    for name, cmd in DEFAULT_GATES:
-        try:
-            code, out = _run(cmd, cwd=worktree_path)
-            res.append(GateResult(name, "pass" if code == 0 else "fail", clamp_text(out, 15000)))
-        except Exception as e:
-            res.append(GateResult(name, "fail", clamp_text(str(e), 15000)))
-    return res
+    # The gates are independent subprocesses and the threads only block
+    # in wait(), so running them concurrently drops wall time from the
+    # sum of the gate durations to the slowest one. Results keep the
+    # DEFAULT_GATES order regardless of completion order.
+    max_workers = min(len(DEFAULT_GATES), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = [ex.submit(_one_gate, name, cmd, worktree_path) for name, cmd in DEFAULT_GATES]
+        return [f.result() for f in futures]
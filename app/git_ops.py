@@ -1,7 +1,13 @@
 from __future__ import annotations
-import os, subprocess, shutil
+import os, subprocess, shutil, time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
 
 from .config import WORKSPACE_DIR
 from .locks import file_lock
@@ -36,6 +42,36 @@ def worktrees_root(project_id: int) -> Path:
 def project_lock_path(project_id: int) -> Path:
     return project_root(project_id) / ".gitops.lock"
 
+# Finer-grained locks: the project lock is only needed for operations
+# that mutate the shared repo (clone/fetch, worktree add/remove).
+# Commits touch a single worktree's index/HEAD and pushes touch a single
+# branch ref, so they get their own lock files and runs on different
+# slices no longer serialize against each other. Lock files live next to
+# (not inside) the worktree so `git add -A` never picks them up.
+
+def worktree_lock_path(wt: Path) -> Path:
+    return wt.parent / f".{wt.name}.lock"
+
+def push_lock_path(project_id: int, branch: str) -> Path:
+    return project_root(project_id) / f".push-{branch.replace('/', '_')}.lock"
+
+# A fetch done this recently is considered current; creating a worktree
+# right after clone_or_update_project_repo (the normal run sequence)
+# then skips its own fetch — the slowest step and a network round-trip.
+FETCH_REUSE_WINDOW_SEC = 30
+
+def fetch_marker_path(project_id: int) -> Path:
+    return project_root(project_id) / ".last_fetch"
+
+def _mark_fetched(project_id: int) -> None:
+    fetch_marker_path(project_id).touch()
+
+def _recently_fetched(project_id: int) -> bool:
+    try:
+        return (time.time() - fetch_marker_path(project_id).stat().st_mtime) < FETCH_REUSE_WINDOW_SEC
+    except OSError:
+        return False
+
 def clone_or_update_project_repo(project_id: int, repo_url: str, default_branch: str) -> Path:
     WORKSPACE_DIR.mkdir(parents=True, exist_ok=True)
     root = project_root(project_id)
@@ -45,16 +81,23 @@ def clone_or_update_project_repo(project_id: int, repo_url: str, default_branch:
     with file_lock(project_lock_path(project_id), timeout_sec=60):
         if (repo / ".git").exists():
             _run(["git", "fetch", "--all", "--prune"], cwd=repo, timeout_sec=300)
+            _mark_fetched(project_id)
             _run(["git", "checkout", default_branch], cwd=repo, timeout_sec=120)
             _run(["git", "pull", "--ff-only"], cwd=repo, timeout_sec=300)
             return repo
         _run(["git", "clone", "--branch", default_branch, "--single-branch", repo_url, str(repo)], timeout_sec=600)
+        _mark_fetched(project_id)
         return repo
 
-def ensure_branch_from(repo: Path, branch: str, base_ref: str) -> None:
+def _branch_exists(repo: Path, branch: str) -> bool:
     try:
-        _run(["git", "show-ref", "--verify", f"refs/heads/{branch}"], cwd=repo, timeout_sec=60)
+        _run(["git", "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"], cwd=repo, timeout_sec=60)
+        return True
     except GitError:
+        return False
+
+def ensure_branch_from(repo: Path, branch: str, base_ref: str) -> None:
+    if not _branch_exists(repo, branch):
         _run(["git", "branch", branch, base_ref], cwd=repo, timeout_sec=60)
 
 def create_worktree(project_id: int, branch: str, base_ref: str, run_id: int) -> Path:
@@ -64,33 +107,83 @@ def create_worktree(project_id: int, branch: str, base_ref: str, run_id: int) ->
     wt_path = (wt_root / f"run_{run_id}_{branch.replace('/', '_')}").resolve()
 
     with file_lock(project_lock_path(project_id), timeout_sec=120):
-        _run(["git", "fetch", "--all", "--prune"], cwd=repo, timeout_sec=300)
-        ensure_branch_from(repo, branch, base_ref)
+        # Each git call is a fork/exec; skip the fetch when one just
+        # happened and fold branch creation into worktree add (-b) so the
+        # common path is two spawns instead of five.
+        if not _recently_fetched(project_id):
+            _run(["git", "fetch", "--all", "--prune"], cwd=repo, timeout_sec=300)
+            _mark_fetched(project_id)
         if wt_path.exists():
             try:
                 _run(["git", "worktree", "remove", "--force", str(wt_path)], cwd=repo, timeout_sec=120)
             except Exception:
                 pass
             shutil.rmtree(wt_path, ignore_errors=True)
-        _run(["git", "worktree", "add", str(wt_path), branch], cwd=repo, timeout_sec=180)
+        if _branch_exists(repo, branch):
+            _run(["git", "worktree", "add", str(wt_path), branch], cwd=repo, timeout_sec=180)
+        else:
+            _run(["git", "worktree", "add", str(wt_path), "-b", branch, base_ref], cwd=repo, timeout_sec=180)
     return wt_path
 
+# Open repository handles, keyed by path. Read-only queries through
+# libgit2 then skip both the fork/exec of a git binary and re-walking
+# the refs on every call.
+_repo_cache: dict[str, Any] = {}
+
+def _repo(repo_or_wt: Path):
+    key = str(repo_or_wt)
+    repo = _repo_cache.get(key)
+    if repo is None:
+        repo = pygit2.Repository(key)
+        _repo_cache[key] = repo
+    return repo
+
+def _status_code(flags: int) -> str:
+    """Approximate git's two-column porcelain code for a pygit2 flag set."""
+    if flags & pygit2.GIT_STATUS_WT_NEW:
+        return "??"
+    index = " "
+    if flags & pygit2.GIT_STATUS_INDEX_NEW:
+        index = "A"
+    elif flags & pygit2.GIT_STATUS_INDEX_MODIFIED:
+        index = "M"
+    elif flags & pygit2.GIT_STATUS_INDEX_DELETED:
+        index = "D"
+    wt = " "
+    if flags & pygit2.GIT_STATUS_WT_MODIFIED:
+        wt = "M"
+    elif flags & pygit2.GIT_STATUS_WT_DELETED:
+        wt = "D"
+    return index + wt
+
 def current_sha(repo_or_wt: Path) -> str:
+    if PYGIT2_AVAILABLE:
+        try:
+            return str(_repo(repo_or_wt).head.target)
+        except Exception:
+            # Worktrees or unborn HEADs libgit2 can't resolve
+            pass
     return _run(["git", "rev-parse", "HEAD"], cwd=repo_or_wt, timeout_sec=60).strip()
 
 def status_porcelain(repo_or_wt: Path) -> str:
+    if PYGIT2_AVAILABLE:
+        try:
+            st = _repo(repo_or_wt).status()
+            return "".join(f"{_status_code(flags)} {path}\n" for path, flags in st.items())
+        except Exception:
+            pass
     return _run(["git", "status", "--porcelain"], cwd=repo_or_wt, timeout_sec=60)
 
 def commit_all(project_id: int, repo_or_wt: Path, message: str) -> str:
     if not status_porcelain(repo_or_wt).strip():
         return current_sha(repo_or_wt)
-    with file_lock(project_lock_path(project_id), timeout_sec=120):
+    with file_lock(worktree_lock_path(repo_or_wt), timeout_sec=120):
         _run(["git", "add", "-A"], cwd=repo_or_wt, timeout_sec=120)
         _run(["git", "commit", "-m", message], cwd=repo_or_wt, timeout_sec=120)
         return current_sha(repo_or_wt)
 
 def push_branch(project_id: int, repo_or_wt: Path, branch: str) -> str:
-    with file_lock(project_lock_path(project_id), timeout_sec=180):
+    with file_lock(push_lock_path(project_id, branch), timeout_sec=180):
         return _run(["git", "push", "-u", "origin", branch], cwd=repo_or_wt, timeout_sec=300)
 
 def write_file(repo_or_wt: Path, rel_path: str, content: str) -> None:
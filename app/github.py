@@ -1,11 +1,19 @@
 from __future__ import annotations
+import asyncio
+import atexit
 import os
 import re
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
 import httpx
 
+# Compiled once at import so repeated URL parsing skips re's internal
+# pattern-cache lookup (and its lock).
+_SSH_RE = re.compile(r"^git@github\.com:([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+?)(?:\.git)?$")
+_HTTPS_RE = re.compile(r"^https?://github\.com/([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+?)(?:\.git)?/?$")
+
 @dataclass
 class GithubRepo:
     owner: str
@@ -15,17 +23,21 @@ def parse_github_repo(repo_url: str) -> Optional[GithubRepo]:
     """Parse GitHub owner/repo from common SSH/HTTPS URLs."""
     s = repo_url.strip()
 
-    m = re.match(r"^git@github\.com:([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+?)(?:\.git)?$", s)
-    if m:
-        return GithubRepo(owner=m.group(1), repo=m.group(2))
-
-    m = re.match(r"^https?://github\.com/([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+?)(?:\.git)?/?$", s)
+    m = _SSH_RE.match(s) or _HTTPS_RE.match(s)
     if m:
         return GithubRepo(owner=m.group(1), repo=m.group(2))
 
     return None
 
-def _client() -> httpx.Client:
+# One process-wide client (httpx.Client is thread-safe for sync use) so
+# consecutive GitHub API calls reuse the keep-alive connection instead of
+# paying DNS + TLS handshake per call. Built lazily on first use; env is
+# read once at that point, matching how the rest of the app treats
+# startup configuration.
+_CLIENT: Optional[httpx.Client] = None
+_CLIENT_LOCK = threading.Lock()
+
+def _client_settings() -> tuple[str, dict]:
     token = os.getenv("GITHUB_TOKEN", "").strip()
     if not token:
         raise RuntimeError("GITHUB_TOKEN is not set")
@@ -35,28 +47,99 @@ def _client() -> httpx.Client:
         "Accept": "application/vnd.github+json",
         "User-Agent": "agent-dev-dashboard-route3",
     }
-    return httpx.Client(base_url=api_url, headers=headers, timeout=30.0)
+    return api_url, headers
+
+def _client() -> httpx.Client:
+    global _CLIENT
+    client = _CLIENT
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _CLIENT
+            if client is None:
+                api_url, headers = _client_settings()
+                client = _CLIENT = httpx.Client(
+                    base_url=api_url,
+                    headers=headers,
+                    timeout=30.0,
+                    limits=httpx.Limits(max_keepalive_connections=20),
+                )
+                atexit.register(client.close)
+    return client
+
+def _async_client() -> httpx.AsyncClient:
+    """Build an async client, multiplexing over HTTP/2 when h2 is installed.
+
+    Async connections are bound to the event loop they were opened on,
+    so unlike the sync client this is built per batch rather than held
+    as a process-wide singleton.
+    """
+    api_url, headers = _client_settings()
+    try:
+        return httpx.AsyncClient(base_url=api_url, headers=headers, timeout=30.0, http2=True)
+    except ImportError:
+        return httpx.AsyncClient(base_url=api_url, headers=headers, timeout=30.0)
 
 def create_or_get_pr(owner: str, repo: str, title: str, head: str, base: str, body: str = "") -> dict:
     """Create PR; if already exists, return existing open PR for that head+base."""
-    with _client() as c:
-        r = c.post(f"/repos/{owner}/{repo}/pulls", json={"title": title, "head": head, "base": base, "body": body})
-        if r.status_code in (200, 201):
-            return r.json()
-
-        if r.status_code == 422:
-            head_q = f"{owner}:{head}" if ":" not in head else head
-            r2 = c.get(f"/repos/{owner}/{repo}/pulls", params={"state": "open", "head": head_q, "base": base, "per_page": 10})
-            r2.raise_for_status()
-            items = r2.json()
-            if items:
-                return items[0]
-
-        r.raise_for_status()
-        return {}
+    c = _client()
+    r = c.post(f"/repos/{owner}/{repo}/pulls", json={"title": title, "head": head, "base": base, "body": body})
+    if r.status_code in (200, 201):
+        return r.json()
+
+    if r.status_code == 422:
+        head_q = f"{owner}:{head}" if ":" not in head else head
+        r2 = c.get(f"/repos/{owner}/{repo}/pulls", params={"state": "open", "head": head_q, "base": base, "per_page": 10})
+        r2.raise_for_status()
+        items = r2.json()
+        if items:
+            return items[0]
+
+    r.raise_for_status()
+    return {}
 
 def comment_on_pr(owner: str, repo: str, pr_number: int, body: str) -> dict:
-    with _client() as c:
-        r = c.post(f"/repos/{owner}/{repo}/issues/{pr_number}/comments", json={"body": body})
-        r.raise_for_status()
+    r = _client().post(f"/repos/{owner}/{repo}/issues/{pr_number}/comments", json={"body": body})
+    r.raise_for_status()
+    return r.json()
+
+async def acreate_or_get_pr(c: httpx.AsyncClient, owner: str, repo: str, title: str, head: str, base: str, body: str = "") -> dict:
+    """Async variant of create_or_get_pr, for use inside gh_batch."""
+    r = await c.post(f"/repos/{owner}/{repo}/pulls", json={"title": title, "head": head, "base": base, "body": body})
+    if r.status_code in (200, 201):
         return r.json()
+
+    if r.status_code == 422:
+        head_q = f"{owner}:{head}" if ":" not in head else head
+        r2 = await c.get(f"/repos/{owner}/{repo}/pulls", params={"state": "open", "head": head_q, "base": base, "per_page": 10})
+        r2.raise_for_status()
+        items = r2.json()
+        if items:
+            return items[0]
+
+    r.raise_for_status()
+    return {}
+
+async def acomment_on_pr(c: httpx.AsyncClient, owner: str, repo: str, pr_number: int, body: str) -> dict:
+    """Async variant of comment_on_pr, for use inside gh_batch."""
+    r = await c.post(f"/repos/{owner}/{repo}/issues/{pr_number}/comments", json={"body": body})
+    r.raise_for_status()
+    return r.json()
+
+def gh_batch(calls: list[Callable[[httpx.AsyncClient], Awaitable[Any]]]) -> list[Any]:
+    """
+    Run several GitHub API calls concurrently over one connection.
+
+    Each call receives the shared AsyncClient; with HTTP/2 the requests
+    multiplex over a single TLS connection, so total time is roughly the
+    slowest round-trip instead of the sum. Usable from sync callers:
+
+        prs = gh_batch([
+            lambda c: acreate_or_get_pr(c, owner, repo, t, h, b)
+            for t, h, b in pending
+        ])
+    """
+    async def _runner() -> list[Any]:
+        async with _async_client() as c:
+            return await asyncio.gather(*(call(c) for call in calls))
+
+    return asyncio.run(_runner())
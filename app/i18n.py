@@ -2,7 +2,10 @@
 Internationalization (i18n) module for Agent Dev Dashboard.
 Supports English and Chinese languages.
 """
-from typing import Dict
+import string
+import sys
+from types import MappingProxyType
+from typing import Dict, List, Tuple
 
 # Translations
 TRANSLATIONS: Dict[str, Dict[str, str]] = {
@@ -390,6 +393,33 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
 }
 
 
+# Intern every key and value once at import. Callers overwhelmingly pass
+# literal keys (already interned by the compiler), so equality inside the
+# dict probe becomes a pointer compare, and duplicate strings across the
+# languages collapse to one object. The rebuilt per-language tables are
+# exposed as read-only views: the flat dict and compiled-template caches
+# below assume the source never changes after import, and the proxy makes
+# accidental runtime mutation a TypeError instead of a stale cache.
+TRANSLATIONS = {
+    lang: MappingProxyType({sys.intern(key): sys.intern(text) for key, text in entries.items()})
+    for lang, entries in TRANSLATIONS.items()
+}
+
+# Runtime lookups go through a flat (lang, key) -> text dict built once at
+# import: one hash probe instead of two nested ones plus membership checks.
+# The nested TRANSLATIONS above stays as the editable source of truth.
+_FLAT: Dict[Tuple[str, str], str] = {
+    (lang, key): text for lang, entries in TRANSLATIONS.items() for key, text in entries.items()
+}
+_VALID_LANGS = frozenset(TRANSLATIONS)
+
+# Format templates parsed once per (lang, key). `str.format` reparses its
+# template on every call, which is pure overhead when the same few
+# translations format on every rendered page; here each call just walks
+# the pre-split literal/field tuples.
+_COMPILED: Dict[Tuple[str, str], List[tuple]] = {}
+
+
 def get_translation(lang: str, key: str, **kwargs) -> str:
     """
     Get translated text for a given key and language.
@@ -402,21 +432,38 @@ def get_translation(lang: str, key: str, **kwargs) -> str:
     Returns:
         Translated string, or the key itself if not found
     """
-    if lang not in TRANSLATIONS:
+    if lang not in _VALID_LANGS:
         lang = "en"
-    if key not in TRANSLATIONS[lang]:
+    text = _FLAT.get((lang, key))
+    if text is None:
         return key
-    text = TRANSLATIONS[lang][key]
-    if kwargs:
-        try:
-            return text.format(**kwargs)
-        except (KeyError, ValueError):
-            return text
-    return text
+    if not kwargs:
+        return text
+    parts = _COMPILED.get((lang, key))
+    if parts is None:
+        parts = _COMPILED.setdefault((lang, key), list(string.Formatter().parse(text)))
+    try:
+        return "".join(
+            literal + ("" if field is None else format(kwargs[field], spec or ""))
+            for literal, field, spec, _conv in parts
+        )
+    except (KeyError, ValueError):
+        return text
+
+
+def t(lang: str, key: str) -> str:
+    """Plain lookup, no format arguments — the overwhelmingly common case.
+
+    One flat-dict probe; use tf() when the translation takes variables.
+    """
+    if lang not in _VALID_LANGS:
+        lang = "en"
+    text = _FLAT.get((lang, key))
+    return text if text is not None else key
 
 
-def t(lang: str, key: str, **kwargs) -> str:
-    """Shorthand for get_translation."""
+def tf(lang: str, key: str, **kwargs) -> str:
+    """Shorthand for get_translation, for translations with format args."""
     return get_translation(lang, key, **kwargs)
 
 
@@ -430,8 +477,8 @@ def get_language(request) -> str:
     Returns:
         Language code ('en' or 'zh')
     """
-    lang = request.session.get("lang", "en")
-    return lang if lang in ("en", "zh") else "en"
+    lang = request.session.get("lang")
+    return lang if lang in _VALID_LANGS else "en"
 
 
 def set_language(request, lang: str) -> None:
@@ -442,5 +489,5 @@ def set_language(request, lang: str) -> None:
         request: FastAPI Request object
         lang: Language code ('en' or 'zh')
     """
-    if lang in ("en", "zh"):
+    if lang in _VALID_LANGS:
         request.session["lang"] = lang
@@ -2,11 +2,13 @@
 Invitation code management system for user registration.
 Only project owners can generate invitation codes.
 """
+import base64
 import secrets
-import string
 from datetime import datetime, timedelta
 from typing import Optional
 
+from sqlalchemy.exc import IntegrityError
+
 from .db import fetchone, fetchall, execute
 from .utils import now_iso
 
@@ -21,8 +23,11 @@ def generate_invite_code(length: int = 12) -> str:
     Returns:
         Random code consisting of uppercase letters and numbers
     """
-    alphabet = string.ascii_uppercase + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    # One CSPRNG call plus a C-level base32 encode instead of one
+    # secrets.choice per character; the alphabet (A-Z, 2-7) stays within
+    # uppercase letters and numbers. 5 bits of entropy per character.
+    raw = secrets.token_bytes((length * 5 + 7) // 8)
+    return base64.b32encode(raw).decode('ascii').rstrip('=')[:length]
 
 
 def create_invitation(project_id: int, created_by_user_id: int, expires_days: int = 7) -> str:
@@ -37,21 +42,26 @@ def create_invitation(project_id: int, created_by_user_id: int, expires_days: in
     Returns:
         The invitation code
     """
-    code = generate_invite_code()
-
     # Calculate expiration time
     expires_at = None
     if expires_days > 0:
         expiry = datetime.utcnow() + timedelta(days=expires_days)
         expires_at = expiry.isoformat()
 
-    invitation_id = execute(
-        """INSERT INTO invitations (code, project_id, created_by_user_id, status, created_at, expires_at)
-           VALUES (?, ?, ?, 'pending', ?, ?)""",
-        (code, project_id, created_by_user_id, now_iso(), expires_at)
-    )
-
-    return code
+    # `code` is unique; a collision at 12 base32 characters is vanishingly
+    # rare, so just regenerate and retry if one ever happens.
+    for _ in range(3):
+        code = generate_invite_code()
+        try:
+            execute(
+                """INSERT INTO invitations (code, project_id, created_by_user_id, status, created_at, expires_at)
+                   VALUES (?, ?, ?, 'pending', ?, ?)""",
+                (code, project_id, created_by_user_id, now_iso(), expires_at)
+            )
+            return code
+        except IntegrityError:
+            continue
+    raise RuntimeError("Could not generate a unique invitation code")
 
 
 def validate_invitation(code: str) -> Optional[dict]:
@@ -64,26 +74,17 @@ def validate_invitation(code: str) -> Optional[dict]:
     Returns:
         Invitation dict if valid, None otherwise
     """
+    # Expiry check lives in the WHERE clause; stored timestamps are
+    # isoformat strings, which compare correctly as strings. `code` is
+    # unique, so this is a single index seek.
     invitation = fetchone(
         """SELECT * FROM invitations
            WHERE code = ? AND status = 'pending'
-           ORDER BY created_at DESC LIMIT 1""",
-        (code,)
+             AND (expires_at IS NULL OR expires_at > ?)""",
+        (code, datetime.utcnow().isoformat())
     )
 
-    if not invitation:
-        return None
-
-    # Check expiration
-    if invitation["expires_at"]:
-        try:
-            expiry = datetime.fromisoformat(invitation["expires_at"])
-            if datetime.utcnow() > expiry:
-                return None  # Expired
-        except ValueError:
-            return None  # Invalid date format
-
-    return dict(invitation)
+    return dict(invitation) if invitation else None
 
 
 def use_invitation(code: str, user_id: int) -> bool:
@@ -97,40 +98,28 @@ def use_invitation(code: str, user_id: int) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    invitation = fetchone(
-        "SELECT * FROM invitations WHERE code = ? AND status = 'pending'",
-        (code,)
-    )
-
-    if not invitation:
-        return False
-
-    # Check expiration
-    if invitation["expires_at"]:
-        try:
-            expiry = datetime.fromisoformat(invitation["expires_at"])
-            if datetime.utcnow() > expiry:
-                return False  # Expired
-        except ValueError:
-            pass
-
-    # Mark as used
-    execute(
+    # Single conditional UPDATE: the status and expiry predicates make
+    # the claim atomic, so two users redeeming the same code can't both
+    # succeed, and the old SELECT round-trip disappears.
+    rows = execute(
         """UPDATE invitations
            SET status = 'used', used_by_user_id = ?, used_at = ?
-           WHERE code = ?""",
-        (user_id, now_iso(), code)
+           WHERE code = ? AND status = 'pending'
+             AND (expires_at IS NULL OR expires_at > ?)""",
+        (user_id, now_iso(), code, datetime.utcnow().isoformat())
     )
 
-    return True
+    return rows > 0
 
 
-def get_project_invitations(project_id: int) -> list:
+def get_project_invitations(project_id: int, limit: int = 200, offset: int = 0) -> list:
     """
-    Get all invitations for a project.
+    Get invitations for a project, newest first.
 
     Args:
         project_id: Project ID
+        limit: Maximum rows to return (default 200)
+        offset: Rows to skip, for pagination
 
     Returns:
         List of invitation dictionaries
@@ -141,19 +130,22 @@ def get_project_invitations(project_id: int) -> list:
            LEFT JOIN users u1 ON u1.id = i.created_by_user_id
            LEFT JOIN users u2 ON u2.id = i.used_by_user_id
            WHERE i.project_id = ?
-           ORDER BY i.created_at DESC""",
-        (project_id,)
+           ORDER BY i.created_at DESC
+           LIMIT ? OFFSET ?""",
+        (project_id, limit, offset)
     )
 
-    return [dict(inv) for inv in invitations]
+    return list(map(dict, invitations))
 
 
-def get_user_invitations(user_id: int) -> list:
+def get_user_invitations(user_id: int, limit: int = 200, offset: int = 0) -> list:
     """
-    Get all invitations created by a user.
+    Get invitations created by a user, newest first.
 
     Args:
         user_id: User ID
+        limit: Maximum rows to return (default 200)
+        offset: Rows to skip, for pagination
 
     Returns:
         List of invitation dictionaries
@@ -163,11 +155,12 @@ def get_user_invitations(user_id: int) -> list:
            FROM invitations i
            LEFT JOIN projects p ON p.id = i.project_id
            WHERE i.created_by_user_id = ?
-           ORDER BY i.created_at DESC""",
-        (user_id,)
+           ORDER BY i.created_at DESC
+           LIMIT ? OFFSET ?""",
+        (user_id, limit, offset)
     )
 
-    return [dict(inv) for inv in invitations]
+    return list(map(dict, invitations))
 
 
 def revoke_invitation(code: int) -> bool:
@@ -1,9 +1,60 @@
 from __future__ import annotations
-from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Any
+import asyncio
+import queue
+import threading
+from typing import Any, Callable, Coroutine, Optional
+from concurrent.futures import Future
 from .config import MAX_WORKERS
 
-_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+# Bounded queue + persistent daemon workers instead of ThreadPoolExecutor:
+# callers discard the Future anyway, so each submit skips the Future
+# allocation, and the bound gives backpressure — a burst of gate/LLM jobs
+# blocks at submit instead of growing an unbounded internal queue.
+_q: queue.Queue[Callable[[], Any]] = queue.Queue(maxsize=MAX_WORKERS * 8)
+
+
+def _worker() -> None:
+    while True:
+        fn = _q.get()
+        try:
+            fn()
+        except Exception:
+            # Background jobs handle/record their own failures; a raise
+            # here must not kill the worker thread.
+            pass
+        finally:
+            _q.task_done()
+
+
+for _ in range(MAX_WORKERS):
+    threading.Thread(target=_worker, daemon=True).start()
+
 
 def submit(fn: Callable[[], Any]) -> None:
-    _executor.submit(fn)
+    _q.put(fn)
+
+
+# One shared event loop on its own daemon thread for I/O-bound async work
+# (LLMClient.achat and friends). Unlike the worker pool above, in-flight
+# coroutines are just pending sockets, so fan-out isn't capped at
+# MAX_WORKERS threads. Started lazily on first use.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    loop = _loop
+    if loop is None:
+        with _loop_lock:
+            loop = _loop
+            if loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True).start()
+                _loop = loop
+    return loop
+
+
+def submit_async(coro: Coroutine[Any, Any, Any]) -> Future:
+    """Schedule a coroutine on the shared loop; the Future may be ignored."""
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop())
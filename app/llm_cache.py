@@ -0,0 +1,67 @@
+"""
+Content-Addressed LLM Response Cache
+
+Caches chat_simple responses keyed by a sha256 over the full request
+(model, prompts, max_tokens, temperature) so re-running a role on an
+unchanged slice returns instantly instead of paying the API round-trip.
+
+Only deterministic requests (temperature == 0) are cacheable; sampling
+at temperature > 0 is expected to vary between calls. The cache is
+opt-in via LLM_CACHE_ENABLED=1 and lives in the app database (WAL mode
+handles concurrent writers).
+"""
+from __future__ import annotations
+import hashlib
+import os
+from typing import Optional
+
+from .db import fetchone, execute
+from .utils import dumps_canonical, now_iso
+
+
+def cache_enabled() -> bool:
+    """Check whether response caching is switched on."""
+    return os.getenv("LLM_CACHE_ENABLED", "0") == "1"
+
+
+def cache_key(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: Optional[int],
+    temperature: Optional[float],
+) -> Optional[str]:
+    """
+    Compute the cache key for a request, or None if it is not cacheable.
+
+    Requests sampled at temperature > 0 return None: their responses are
+    intentionally non-deterministic and must not be replayed.
+    """
+    if temperature is not None and temperature > 0:
+        return None
+    payload = dumps_canonical(
+        {
+            "model": model,
+            "system": system_prompt,
+            "user": user_prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get_cached_response(key: str) -> Optional[str]:
+    """Return the cached response content for a key, if present."""
+    row = fetchone("SELECT response FROM llm_cache WHERE key = ?", (key,))
+    return row["response"] if row else None
+
+
+def store_response(key: str, response: str) -> None:
+    """Store a response under a key; concurrent duplicate inserts are ignored."""
+    execute(
+        """INSERT INTO llm_cache (key, response, created_at)
+           VALUES (?, ?, ?)
+           ON CONFLICT(key) DO NOTHING""",
+        (key, response, now_iso()),
+    )
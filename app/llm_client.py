@@ -8,28 +8,68 @@ Supports hierarchical configuration:
     3. Global default configuration (.env file)
 """
 from __future__ import annotations
+import functools
+import hashlib
 import os
+import threading
+from collections import OrderedDict
 from typing import Any, Optional
 from dataclasses import dataclass
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
 from .config import LLM_API_KEY, LLM_BASE_URL, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS
+from .llm_cache import cache_enabled, cache_key, get_cached_response, store_response
 from .llm_config import LLMConfig, get_effective_config
-
-
-@dataclass
+from .utils import dumps_canonical
+
+
+# Underlying SDK clients shared per (api_key, base_url). Each OpenAI()
+# owns an httpx connection pool, so separate instances re-handshake TLS
+# even when pointed at the same endpoint; LLMClients for different
+# user/project scopes that resolve to the same credentials now reuse one
+# pool (model/temperature are per-request parameters, not client state).
+_SDK_CLIENTS: dict[tuple[str, str], "OpenAI"] = {}
+# Async pools are bound to the event loop they first awaited on, so all
+# awaits against these must happen on one long-lived loop (agents routes
+# its batches through jobs.submit_async for exactly this reason).
+_ASYNC_SDK_CLIENTS: dict[tuple[str, str], "AsyncOpenAI"] = {}
+_SDK_CLIENTS_LOCK = threading.Lock()
+
+
+def _sdk_clients(api_key: str, base_url: str) -> tuple["OpenAI", "AsyncOpenAI"]:
+    key = (api_key, base_url)
+    client = _SDK_CLIENTS.get(key)
+    if client is None:
+        with _SDK_CLIENTS_LOCK:
+            client = _SDK_CLIENTS.get(key)
+            if client is None:
+                client = _SDK_CLIENTS.setdefault(key, OpenAI(api_key=api_key, base_url=base_url))
+                _ASYNC_SDK_CLIENTS.setdefault(key, AsyncOpenAI(api_key=api_key, base_url=base_url))
+    return client, _ASYNC_SDK_CLIENTS[key]
+
+
+# In-process LRU of responses for deterministic calls: at temperature 0
+# identical prompts yield identical outputs, so pipeline re-runs over the
+# same messages skip the network round-trip. Complements the persistent
+# llm_cache used by chat_simple — this one also covers multi-turn lists.
+_RESP_CACHE: "OrderedDict[bytes, LLMResponse]" = OrderedDict()
+_RESP_CACHE_MAX = 256
+_RESP_CACHE_LOCK = threading.Lock()
+
+
+@dataclass(slots=True, frozen=True)
 class LLMMessage:
     """LLM message structure."""
     role: str  # system, user, assistant
     content: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     """LLM response structure."""
     content: str
@@ -80,11 +120,9 @@ class LLMClient:
                 "LLM_API_KEY is required. Set it as environment variable or pass it to the constructor."
             )
 
-        # Initialize OpenAI client with custom base_url for GLM compatibility
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-        )
+        # Shared SDK clients (custom base_url for GLM compatibility); the
+        # sync client and its async twin come from one per-endpoint pool
+        self.client, self.async_client = _sdk_clients(self.api_key, self.base_url)
 
     @classmethod
     def from_config(cls, config: LLMConfig) -> "LLMClient":
@@ -124,16 +162,89 @@ class LLMClient:
         Returns:
             LLMResponse with content and metadata
         """
-        # Convert LLMMessage objects to dicts if needed
-        formatted_messages = []
-        for msg in messages:
-            if isinstance(msg, LLMMessage):
-                formatted_messages.append({"role": msg.role, "content": msg.content})
-            else:
-                formatted_messages.append(msg)
+        # Message lists are homogeneous in practice: dicts pass through
+        # untouched, so only LLMMessage callers pay for the conversion
+        if messages and isinstance(messages[0], dict):
+            formatted_messages = messages
+        else:
+            formatted_messages = [{"role": m.role, "content": m.content} for m in messages]
+
+        eff_temperature = temperature if temperature is not None else self.temperature
+        eff_max_tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        resp_key = None
+        if eff_temperature == 0 and not kwargs:
+            resp_key = hashlib.blake2b(
+                dumps_canonical([list(formatted_messages), self.model, eff_max_tokens]),
+                digest_size=16,
+            ).digest()
+            with _RESP_CACHE_LOCK:
+                hit = _RESP_CACHE.get(resp_key)
+                if hit is not None:
+                    _RESP_CACHE.move_to_end(resp_key)
+                    return hit
 
         try:
             response = self.client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=eff_temperature,
+                max_tokens=eff_max_tokens,
+                **kwargs,
+            )
+
+            content = response.choices[0].message.content
+            tokens_used = response.usage.total_tokens if response.usage else None
+
+            result = LLMResponse(
+                content=content,
+                model=response.model,
+                tokens_used=tokens_used,
+            )
+
+        except Exception as e:
+            return LLMResponse(
+                content="",
+                model=self.model,
+                error=str(e),
+            )
+
+        if resp_key is not None:
+            with _RESP_CACHE_LOCK:
+                _RESP_CACHE[resp_key] = result
+                _RESP_CACHE.move_to_end(resp_key)
+                while len(_RESP_CACHE) > _RESP_CACHE_MAX:
+                    _RESP_CACHE.popitem(last=False)
+        return result
+
+    async def achat(
+        self,
+        messages: list[LLMMessage] | list[dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> LLMResponse:
+        """
+        Async variant of chat, for issuing independent requests concurrently.
+
+        Args:
+            messages: List of message objects with 'role' and 'content' keys
+            temperature: Override default temperature
+            max_tokens: Override default max_tokens
+            **kwargs: Additional parameters to pass to the API
+
+        Returns:
+            LLMResponse with content and metadata
+        """
+        # Message lists are homogeneous in practice: dicts pass through
+        # untouched, so only LLMMessage callers pay for the conversion
+        if messages and isinstance(messages[0], dict):
+            formatted_messages = messages
+        else:
+            formatted_messages = [{"role": m.role, "content": m.content} for m in messages]
+
+        try:
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=formatted_messages,
                 temperature=temperature if temperature is not None else self.temperature,
@@ -176,15 +287,85 @@ class LLMClient:
         Returns:
             LLMResponse with content and metadata
         """
+        key = self._response_cache_key(system_prompt, user_prompt, temperature, max_tokens)
+        if key:
+            cached = get_cached_response(key)
+            if cached is not None:
+                return LLMResponse(content=cached, model=self.model)
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        response = self.chat(messages, temperature=temperature, max_tokens=max_tokens)
+
+        if key and not response.error:
+            store_response(key, response.content)
+        return response
+
+    def _response_cache_key(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Optional[str]:
+        """Cache key for a simple request, or None when caching is off/unusable."""
+        if not cache_enabled():
+            return None
+        return cache_key(
+            self.model,
+            system_prompt,
+            user_prompt,
+            max_tokens if max_tokens is not None else self.max_tokens,
+            temperature if temperature is not None else self.temperature,
+        )
+
+    async def achat_simple(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        """
+        Async variant of chat_simple.
+
+        Args:
+            system_prompt: System message setting up the context
+            user_prompt: User message with the actual task
+            temperature: Override default temperature
+            max_tokens: Override default max_tokens
+
+        Returns:
+            LLMResponse with content and metadata
+        """
+        key = self._response_cache_key(system_prompt, user_prompt, temperature, max_tokens)
+        if key:
+            cached = get_cached_response(key)
+            if cached is not None:
+                return LLMResponse(content=cached, model=self.model)
+
         messages = [
-            LLMMessage(role="system", content=system_prompt),
-            LLMMessage(role="user", content=user_prompt),
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
         ]
-        return self.chat(messages, temperature=temperature, max_tokens=max_tokens)
+        response = await self.achat(messages, temperature=temperature, max_tokens=max_tokens)
+
+        if key and not response.error:
+            store_response(key, response.content)
+        return response
 
 
-# Singleton instance for convenience
-_global_client: Optional[LLMClient] = None
+@functools.lru_cache(maxsize=128)
+def _get_client_cached(
+    user_id: Optional[int],
+    project_id: Optional[int],
+    provider: str,
+) -> LLMClient:
+    """Build (and memoize) a client for one config scope."""
+    config = get_effective_config(user_id, project_id, provider)
+    return LLMClient.from_config(config)
 
 
 def get_llm_client(
@@ -198,6 +379,11 @@ def get_llm_client(
     2. Project-level configuration
     3. Global default configuration
 
+    Clients are memoized per (user_id, project_id, provider): running
+    several roles back-to-back for one slice reuses a single client —
+    one config lookup and one HTTP connection pool with keep-alive —
+    instead of re-reading config and re-handshaking TLS per call.
+
     Args:
         user_id: User ID (optional)
         project_id: Project ID (optional)
@@ -206,11 +392,14 @@ def get_llm_client(
     Returns:
         LLMClient instance
     """
-    config = get_effective_config(user_id, project_id, provider)
-    return LLMClient.from_config(config)
+    return _get_client_cached(user_id, project_id, provider)
+
+
+def invalidate_client_cache() -> None:
+    """Drop memoized clients after an LLM config change (or in tests)."""
+    _get_client_cached.cache_clear()
 
 
 def reset_llm_client() -> None:
-    """Reset global LLM client instance (useful for testing)."""
-    global _global_client
-    _global_client = None
+    """Reset cached LLM client instances (useful for testing)."""
+    invalidate_client_cache()
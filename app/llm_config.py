@@ -9,20 +9,24 @@ Supports hierarchical LLM configuration with priority:
 This allows flexible cost allocation and configuration management.
 """
 from __future__ import annotations
+import functools
 import os
+import threading
+import time
 from dataclasses import dataclass
+from itertools import groupby
 from typing import Any, Optional
 
-from .db import fetchone, fetchall, execute
+from .db import fetchone, fetchall, execute, execute_returning
 from .config import (
     LLM_API_KEY, LLM_BASE_URL, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS
 )
 from .utils import now_iso
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMConfig:
-    """LLM configuration data class."""
+    """LLM configuration data class. Frozen so cached instances are shared safely."""
     provider: str
     api_key: str
     base_url: Optional[str] = None
@@ -43,15 +47,24 @@ class LLMConfig:
         }
 
 
+# Read once at import like the rest of the startup configuration
+_LLM_PROVIDER = os.getenv("LLM_PROVIDER", "glm")
+
+
+@functools.lru_cache(maxsize=1)
 def get_global_config() -> LLMConfig:
     """
     Get global default LLM configuration from environment variables.
 
+    The env-derived values never change within a process, so the single
+    frozen instance is built once and shared; tests that mutate the env
+    can call get_global_config.cache_clear().
+
     Returns:
         LLMConfig with global defaults
     """
     return LLMConfig(
-        provider=os.getenv("LLM_PROVIDER", "glm"),
+        provider=_LLM_PROVIDER,
         api_key=LLM_API_KEY or "",
         base_url=LLM_BASE_URL,
         model=LLM_MODEL,
@@ -61,6 +74,19 @@ def get_global_config() -> LLMConfig:
     )
 
 
+# Only the columns LLMConfig actually uses, in a fixed order, kept as
+# module constants so every call presents the identical SQL string to the
+# statement cache and rows can be tuple-unpacked positionally.
+_SQL_USER_CONFIG = (
+    "SELECT provider, api_key, base_url, model, temperature, max_tokens "
+    "FROM user_llm_configs WHERE user_id = ? AND provider = ?"
+)
+_SQL_PROJECT_CONFIG = (
+    "SELECT provider, api_key, base_url, model, temperature, max_tokens "
+    "FROM project_llm_configs WHERE project_id = ? AND provider = ?"
+)
+
+
 def get_user_config(user_id: int, provider: str = "glm") -> Optional[LLMConfig]:
     """
     Get user-level LLM configuration.
@@ -72,22 +98,19 @@ def get_user_config(user_id: int, provider: str = "glm") -> Optional[LLMConfig]:
     Returns:
         LLMConfig if found, None otherwise
     """
-    config = fetchone(
-        """SELECT * FROM user_llm_configs
-           WHERE user_id = ? AND provider = ?""",
-        (user_id, provider)
-    )
+    row = fetchone(_SQL_USER_CONFIG, (user_id, provider))
 
-    if not config:
+    if not row:
         return None
 
+    provider_name, api_key, base_url, model, temperature, max_tokens = row
     return LLMConfig(
-        provider=config["provider"],
-        api_key=config["api_key"],
-        base_url=config.get("base_url"),
-        model=config.get("model"),
-        temperature=config.get("temperature"),
-        max_tokens=config.get("max_tokens"),
+        provider=provider_name,
+        api_key=api_key,
+        base_url=base_url,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
         source="user",
     )
 
@@ -103,26 +126,56 @@ def get_project_config(project_id: int, provider: str = "glm") -> Optional[LLMCo
     Returns:
         LLMConfig if found, None otherwise
     """
-    config = fetchone(
-        """SELECT * FROM project_llm_configs
-           WHERE project_id = ? AND provider = ?""",
-        (project_id, provider)
-    )
+    row = fetchone(_SQL_PROJECT_CONFIG, (project_id, provider))
 
-    if not config:
+    if not row:
         return None
 
+    provider_name, api_key, base_url, model, temperature, max_tokens = row
     return LLMConfig(
-        provider=config["provider"],
-        api_key=config["api_key"],
-        base_url=config.get("base_url"),
-        model=config.get("model"),
-        temperature=config.get("temperature"),
-        max_tokens=config.get("max_tokens"),
+        provider=provider_name,
+        api_key=api_key,
+        base_url=base_url,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
         source="project",
     )
 
 
+# Resolved configs cached per (user_id, project_id, provider) for a short
+# TTL: they are read on every LLM request but change rarely, so the two
+# fetchone round-trips are skipped in steady state. The TTL plus explicit
+# invalidation from the set_*/delete_* mutators keeps edits visible
+# immediately in this process and within 30s from any other.
+_effective_cache: dict[tuple, tuple[float, LLMConfig]] = {}
+_effective_lock = threading.Lock()
+_EFFECTIVE_TTL = 30.0
+
+# In-flight resolutions, for single-flight deduplication: when several
+# threads miss the same key at once, one does the DB work and the rest
+# wait on its Event, then re-read the cache.
+_inflight: dict[tuple, threading.Event] = {}
+
+
+def _invalidate(user_id: Optional[int] = None, project_id: Optional[int] = None) -> None:
+    """Drop cached resolutions that could involve the given scope."""
+    with _effective_lock:
+        if user_id is None and project_id is None:
+            _effective_cache.clear()
+            return
+        for key in [k for k in _effective_cache
+                    if (user_id is not None and k[0] == user_id)
+                    or (project_id is not None and k[1] == project_id)]:
+            del _effective_cache[key]
+
+
+def clear_llm_config_cache() -> None:
+    """Drop all cached effective configs (useful for testing)."""
+    with _effective_lock:
+        _effective_cache.clear()
+
+
 def get_effective_config(
     user_id: Optional[int] = None,
     project_id: Optional[int] = None,
@@ -134,6 +187,9 @@ def get_effective_config(
     2. Project-level configuration
     3. Global default configuration
 
+    Results are cached for a short TTL; config mutations invalidate the
+    affected entries so edits take effect immediately.
+
     Args:
         user_id: User ID (optional)
         project_id: Project ID (optional)
@@ -142,6 +198,68 @@ def get_effective_config(
     Returns:
         Effective LLMConfig
     """
+    cache_key = (user_id, project_id, provider)
+    while True:
+        with _effective_lock:
+            hit = _effective_cache.get(cache_key)
+            if hit is not None and time.monotonic() - hit[0] < _EFFECTIVE_TTL:
+                return hit[1]
+            event = _inflight.get(cache_key)
+            if event is None:
+                event = threading.Event()
+                _inflight[cache_key] = event
+                break  # this thread resolves; others wait on the event
+        # Bounded wait, then loop: if the resolver errored out the cache
+        # stays cold and this thread takes over as resolver.
+        event.wait(5.0)
+
+    try:
+        config = _resolve_effective_config(user_id, project_id, provider)
+        with _effective_lock:
+            _effective_cache[cache_key] = (time.monotonic(), config)
+        return config
+    finally:
+        with _effective_lock:
+            _inflight.pop(cache_key, None)
+        event.set()
+
+
+def _resolve_effective_config(
+    user_id: Optional[int],
+    project_id: Optional[int],
+    provider: str,
+) -> LLMConfig:
+    """Uncached resolution of the user > project > global hierarchy."""
+    # With both scopes in play, fetch user and project rows in one
+    # round-trip; the src tag tells them apart and priority is applied
+    # in Python as before.
+    if user_id and project_id:
+        rows = fetchall(
+            """SELECT 'user' AS src, provider, api_key, base_url, model, temperature, max_tokens
+               FROM user_llm_configs WHERE user_id = ? AND provider = ?
+               UNION ALL
+               SELECT 'project' AS src, provider, api_key, base_url, model, temperature, max_tokens
+               FROM project_llm_configs WHERE project_id = ? AND provider = ?""",
+            (user_id, provider, project_id, provider)
+        )
+        by_source = {
+            row["src"]: LLMConfig(
+                provider=row["provider"],
+                api_key=row["api_key"],
+                base_url=row["base_url"],
+                model=row["model"],
+                temperature=row["temperature"],
+                max_tokens=row["max_tokens"],
+                source=row["src"],
+            )
+            for row in rows
+        }
+        for source in ("user", "project"):
+            config = by_source.get(source)
+            if config and config.api_key:
+                return config
+        return get_global_config()
+
     # Priority 1: User-level configuration
     if user_id:
         user_config = get_user_config(user_id, provider)
@@ -182,27 +300,23 @@ def set_user_config(
     Returns:
         Configuration ID
     """
-    existing = fetchone(
-        "SELECT id FROM user_llm_configs WHERE user_id = ? AND provider = ?",
-        (user_id, provider)
-    )
-
     now = now_iso()
 
-    if existing:
-        execute(
-            """UPDATE user_llm_configs
-               SET api_key = ?, base_url = ?, model = ?, temperature = ?, max_tokens = ?, updated_at = ?
-               WHERE id = ?""",
-            (api_key, base_url, model, temperature, max_tokens, now, existing["id"])
-        )
-        return int(existing["id"])
-    else:
-        return execute(
-            """INSERT INTO user_llm_configs (user_id, provider, api_key, base_url, model, temperature, max_tokens, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (user_id, provider, api_key, base_url, model, temperature, max_tokens, now, now)
-        )
+    # Single atomic UPSERT: the unique (user_id, provider) constraint
+    # resolves insert-vs-update in the database, so the SELECT probe and
+    # its race against the write are gone.
+    row = execute_returning(
+        """INSERT INTO user_llm_configs (user_id, provider, api_key, base_url, model, temperature, max_tokens, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(user_id, provider) DO UPDATE SET
+               api_key = excluded.api_key, base_url = excluded.base_url,
+               model = excluded.model, temperature = excluded.temperature,
+               max_tokens = excluded.max_tokens, updated_at = excluded.updated_at
+           RETURNING id""",
+        (user_id, provider, api_key, base_url, model, temperature, max_tokens, now, now)
+    )
+    _invalidate(user_id=user_id)
+    return int(row["id"])
 
 
 def set_project_config(
@@ -229,27 +343,21 @@ def set_project_config(
     Returns:
         Configuration ID
     """
-    existing = fetchone(
-        "SELECT id FROM project_llm_configs WHERE project_id = ? AND provider = ?",
-        (project_id, provider)
-    )
-
     now = now_iso()
 
-    if existing:
-        execute(
-            """UPDATE project_llm_configs
-               SET api_key = ?, base_url = ?, model = ?, temperature = ?, max_tokens = ?, updated_at = ?
-               WHERE id = ?""",
-            (api_key, base_url, model, temperature, max_tokens, now, existing["id"])
-        )
-        return int(existing["id"])
-    else:
-        return execute(
-            """INSERT INTO project_llm_configs (project_id, provider, api_key, base_url, model, temperature, max_tokens, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (project_id, provider, api_key, base_url, model, temperature, max_tokens, now, now)
-        )
+    # Single atomic UPSERT (see set_user_config)
+    row = execute_returning(
+        """INSERT INTO project_llm_configs (project_id, provider, api_key, base_url, model, temperature, max_tokens, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(project_id, provider) DO UPDATE SET
+               api_key = excluded.api_key, base_url = excluded.base_url,
+               model = excluded.model, temperature = excluded.temperature,
+               max_tokens = excluded.max_tokens, updated_at = excluded.updated_at
+           RETURNING id""",
+        (project_id, provider, api_key, base_url, model, temperature, max_tokens, now, now)
+    )
+    _invalidate(project_id=project_id)
+    return int(row["id"])
 
 
 def delete_user_config(user_id: int, provider: str = "glm") -> bool:
@@ -267,6 +375,7 @@ def delete_user_config(user_id: int, provider: str = "glm") -> bool:
         "DELETE FROM user_llm_configs WHERE user_id = ? AND provider = ?",
         (user_id, provider)
     )
+    _invalidate(user_id=user_id)
     return rows > 0
 
 
@@ -285,6 +394,7 @@ def delete_project_config(project_id: int, provider: str = "glm") -> bool:
         "DELETE FROM project_llm_configs WHERE project_id = ? AND provider = ?",
         (project_id, provider)
     )
+    _invalidate(project_id=project_id)
     return rows > 0
 
 
@@ -303,7 +413,7 @@ def get_all_user_configs(user_id: int) -> list[dict]:
            FROM user_llm_configs WHERE user_id = ?""",
         (user_id,)
     )
-    return [dict(c) for c in configs]
+    return list(map(dict, configs))
 
 
 def get_all_project_configs(project_id: int) -> list[dict]:
@@ -321,7 +431,62 @@ def get_all_project_configs(project_id: int) -> list[dict]:
            FROM project_llm_configs WHERE project_id = ?""",
         (project_id,)
     )
-    return [dict(c) for c in configs]
+    return list(map(dict, configs))
+
+
+def get_all_user_configs_batch(user_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Get LLM configurations for many users in one query.
+
+    One IN query replaces the per-user N+1 pattern when listing configs
+    across accounts (e.g. an admin view).
+
+    Args:
+        user_ids: User IDs to fetch
+
+    Returns:
+        Mapping of user_id to configuration dicts (without API keys)
+    """
+    if not user_ids:
+        return {}
+
+    placeholders = ",".join("?" * len(user_ids))
+    rows = fetchall(
+        f"""SELECT user_id, provider, base_url, model, temperature, max_tokens, created_at, updated_at
+           FROM user_llm_configs WHERE user_id IN ({placeholders})
+           ORDER BY user_id""",
+        tuple(user_ids)
+    )
+    return {
+        uid: list(map(dict, group))
+        for uid, group in groupby(rows, key=lambda row: row["user_id"])
+    }
+
+
+def get_all_project_configs_batch(project_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Get LLM configurations for many projects in one query.
+
+    Args:
+        project_ids: Project IDs to fetch
+
+    Returns:
+        Mapping of project_id to configuration dicts (without API keys)
+    """
+    if not project_ids:
+        return {}
+
+    placeholders = ",".join("?" * len(project_ids))
+    rows = fetchall(
+        f"""SELECT project_id, provider, base_url, model, temperature, max_tokens, created_at, updated_at
+           FROM project_llm_configs WHERE project_id IN ({placeholders})
+           ORDER BY project_id""",
+        tuple(project_ids)
+    )
+    return {
+        pid: list(map(dict, group))
+        for pid, group in groupby(rows, key=lambda row: row["project_id"])
+    }
 
 
 def mask_api_key(api_key: str) -> str:
@@ -334,6 +499,6 @@ def mask_api_key(api_key: str) -> str:
     Returns:
         Masked API key (e.g., "sk-***xyz")
     """
-    if not api_key or len(api_key) < 8:
-        return "***"
-    return f"{api_key[:4]}...{api_key[-4:]}"
+    s = api_key or ""
+    # Slices tolerate any length, so only one length check remains
+    return f"{s[:4]}...{s[-4:]}" if len(s) >= 8 else "***"
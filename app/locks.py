@@ -3,13 +3,56 @@ import os, time
 from pathlib import Path
 from contextlib import contextmanager
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
 class LockTimeout(RuntimeError):
     pass
 
+# Retry interval under contention. flock wakes instantly on the fast
+# path (uncontended LOCK_NB succeeds first try); contended waiters retry
+# at this interval so the timeout stays enforceable from any thread.
+_RETRY_SEC = 0.01
+
 @contextmanager
-def file_lock(lock_path: Path, timeout_sec: int = 30, poll_sec: float = 0.2):
+def file_lock(lock_path: Path, timeout_sec: int = 30):
+    """
+    Exclusive advisory lock on lock_path.
+
+    Uses flock where available: the lock dies with the process (no stale
+    lock files after a crash) and the file is never unlinked, avoiding
+    the unlink/reopen race of the old O_EXCL scheme. Falls back to
+    O_EXCL create-polling on platforms without fcntl.
+    """
     lock_path.parent.mkdir(parents=True, exist_ok=True)
-    start = time.time()
+    # Monotonic deadline: immune to wall-clock (NTP) jumps, and one
+    # comparison per retry instead of a subtraction
+    deadline = time.monotonic() + timeout_sec
+
+    if FCNTL_AVAILABLE:
+        fd = os.open(str(lock_path), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except (BlockingIOError, PermissionError):
+                    if time.monotonic() > deadline:
+                        raise LockTimeout(f"Timed out acquiring lock: {lock_path}")
+                    time.sleep(_RETRY_SEC)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode("utf-8"))
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+        return
+
     fd = None
     while True:
         try:
@@ -17,9 +60,9 @@ def file_lock(lock_path: Path, timeout_sec: int = 30, poll_sec: float = 0.2):
             os.write(fd, str(os.getpid()).encode("utf-8"))
             break
         except FileExistsError:
-            if time.time() - start > timeout_sec:
+            if time.monotonic() > deadline:
                 raise LockTimeout(f"Timed out acquiring lock: {lock_path}")
-            time.sleep(poll_sec)
+            time.sleep(_RETRY_SEC)
     try:
         yield
     finally:
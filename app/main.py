@@ -5,7 +5,13 @@ from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    DefaultJSONResponse = JSONResponse
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 
@@ -13,36 +19,48 @@ from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
 load_dotenv()
 
-from .db import init_db, fetchall, fetchone, execute
+from .db import init_db, fetchall, fetchone, execute, request_connection
 from .config import SESSION_SECRET
 from .auth import authenticate, create_user, get_current_user, has_any_users
-from .utils import now_iso, slugify, clamp_text, branch_name_for_slice
+from .utils import now_iso, slugify, clamp_text, branch_name_for_slice, dumps_canonical
 from .git_ops import clone_or_update_project_repo, create_worktree, commit_all, push_branch
 from .context_pack import build_context_pack
 from .agents import ROLE_RUNNERS
 from .gates import run_gates
 from .jobs import submit
 from .github import parse_github_repo, create_or_get_pr, comment_on_pr
-from .i18n import get_language, set_language, t
+from .i18n import get_language, set_language, t, tf
 from .invitations import validate_invitation, use_invitation, get_project_invitations, create_invitation, revoke_invitation
 from .llm_config import (
     get_user_config, get_project_config, get_effective_config, set_user_config, set_project_config,
     delete_user_config, delete_project_config, get_all_user_configs, get_all_project_configs, mask_api_key
 )
+from .llm_client import invalidate_client_cache
 from .llm_config import LLMConfig
 
-app = FastAPI(title="Agent Dev Dashboard (Route-3 Monolith)")
+app = FastAPI(title="Agent Dev Dashboard (Route-3 Monolith)", default_response_class=DefaultJSONResponse)
 app.add_middleware(SessionMiddleware, secret_key=SESSION_SECRET, same_site="lax", https_only=False)
 templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
 
 
+@app.middleware("http")
+async def db_read_scope(request: Request, call_next):
+    """Share one pooled read connection across all queries in a request."""
+    with request_connection():
+        return await call_next(request)
+
+
 def _get_template_context(request: Request, **extra) -> dict:
     """Build common template context with language support."""
     lang = get_language(request)
     ctx = {
         "request": request,
         "lang": lang,
-        "t": lambda key, **kwargs: t(lang, key, **kwargs),
+        # No current template passes format args to t(); the rare
+        # formatted string goes through tf() instead of making every
+        # lookup carry a **kwargs dict
+        "t": lambda key: t(lang, key),
+        "tf": lambda key, **kwargs: tf(lang, key, **kwargs),
         "user": get_current_user(request),
     }
     ctx.update(extra)
@@ -144,6 +162,7 @@ def update_user_llm_config(
 
     if delete:
         delete_user_config(u["id"], provider)
+        invalidate_client_cache()
         return RedirectResponse(url="/settings?message=config_deleted", status_code=303)
 
     # Only update API key if provided
@@ -163,6 +182,7 @@ def update_user_llm_config(
         temperature=float(temperature) if temperature else None,
         max_tokens=int(max_tokens) if max_tokens else None,
     )
+    invalidate_client_cache()
 
     return RedirectResponse(url="/settings?message=config_saved", status_code=303)
 
@@ -428,6 +448,7 @@ def update_project_llm_config(
 
     if delete:
         delete_project_config(project_id, provider)
+        invalidate_client_cache()
         return RedirectResponse(url=f"/projects/{project_id}", status_code=303)
 
     # Only update API key if provided
@@ -447,6 +468,7 @@ def update_project_llm_config(
         temperature=float(temperature) if temperature else None,
         max_tokens=int(max_tokens) if max_tokens else None,
     )
+    invalidate_client_cache()
 
     return RedirectResponse(url=f"/projects/{project_id}", status_code=303)
 
@@ -550,7 +572,7 @@ def gen_context_pack(slice_id: int, request: Request):
         pack = build_context_pack(wt, s, ac_list)
         ctx_id = execute(
             "INSERT INTO context_packs(slice_id, version, content_json, created_by_user_id, created_at) VALUES(?,?,?,?,?)",
-            (slice_id, version, json.dumps(pack, ensure_ascii=False), u["id"], now_iso()),
+            (slice_id, version, dumps_canonical(pack.to_dict()).decode("utf-8"), u["id"], now_iso()),
         )
         execute("UPDATE runs SET status=?, ended_at=?, log=? WHERE id=?", ("success", now_iso(), f"context pack v{version} created (id={ctx_id})", run_id))
         execute("UPDATE slices SET status=? WHERE id=?", ("ContextReady", slice_id))
@@ -309,6 +309,10 @@ class P2CTracking(Base):
     # Relationships
     slice = relationship("Slice", back_populates="p2c_tracking")
 
+    __table_args__ = (
+        UniqueConstraint("slice_id", "instruction_id", name="idx_p2c_slice_inst"),
+    )
+
 
 class LogicAuditReport(Base):
     __tablename__ = "logic_audit_reports"
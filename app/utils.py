@@ -1,8 +1,15 @@
 from __future__ import annotations
 from datetime import datetime, timezone
+import json
 import re
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -28,3 +35,14 @@ def within_prefix(rel_path: str, allowed_prefixes: Iterable[str]) -> bool:
 
 def branch_name_for_slice(slice_id: int, title: str) -> str:
     return f"slice/{slice_id:04d}-{slugify(title)}"
+
+def dumps_canonical(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes with sorted keys.
+
+    Cache-key derivation and stored payloads need a byte-stable form;
+    orjson with OPT_SORT_KEYS emits it directly as bytes when installed,
+    otherwise stdlib json with compact separators is used.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")